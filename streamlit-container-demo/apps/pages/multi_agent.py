@@ -1,44 +1,466 @@
 import streamlit as st
 import asyncio
-import random
-from datetime import datetime
+import time
 import os
-import concurrent.futures
+import html
+import hashlib
+import inspect
+import logging
+import re
+import threading
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from importlib.util import find_spec
+from itertools import cycle, groupby
+from types import SimpleNamespace
 
-# Cost tracking for multi-agent workflows
-def estimate_tokens(text):
-    """Rough token estimation (1 token ≈ 4 characters)"""
-    return len(str(text)) // 4
+logger = logging.getLogger(__name__)
+
+@dataclass(slots=True, frozen=True)
+class LogEntry:
+    """One step of the multi-agent execution log"""
+    t: float
+    step: str
+    agent: str
+    action: str
+    status: str
+    details: str = ""
+    error: str | None = None
+    tools_used: tuple[str, ...] = ()
+    cost: str = "Not available"
+    cost_usd: float | None = None
+    raw_output: str | None = None
+    # Display strings, formatted once when the entry is logged rather than on every rerun
+    icon: str = field(init=False, repr=False, compare=False)
+    elapsed: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "icon", _STATUS_ICONS.get(self.status, "ℹ️"))
+        object.__setattr__(self, "elapsed", f"+{self.t:.3f}s")
+
+# Status → icon mapping for execution-log entries
+_STATUS_ICONS = {"success": "✅", "error": "❌", "in_progress": "🔄"}
+
+# Streamlit releases whose st.expander reports .open can skip building collapsed bodies
+_LAZY_EXPANDERS = "on_change" in inspect.signature(st.expander).parameters
+
+# Per-session ring buffer limits: cached workflow runs, and log entries kept per run
+_WORKFLOW_CACHE_SIZE = 8
+_LOG_CAPACITY = 500
+
+# Logs longer than this are shown as a table instead of one expander per step
+_LOG_TABLE_THRESHOLD = 20
+
+# Steps rendered per page of the execution log and of the collaboration flow
+_LOG_DISPLAY_LIMIT = 50
+_FLOW_PAGE_SIZE = 10
+
+# Hook events buffered for the live log before new ones are dropped
+_LOG_QUEUE_SIZE = 1000
+
+# Minimum seconds between redraws of the streamed answer
+_STREAM_REFRESH_INTERVAL = 0.05
+
+# Keyword → guidance shown when the workflow fails; the first keyword found in the message wins
+_ERROR_RE = re.compile(r"(event loop|api|key|timeout)", re.IGNORECASE)
+_ERROR_GUIDANCE = {
+    "event loop": "💡 This appears to be an asyncio event loop issue. Try refreshing the page and running again.",
+    "api": "💡 This might be an API key issue. Check that your OpenAI API key is valid and has sufficient credits.",
+    "key": "💡 This might be an API key issue. Check that your OpenAI API key is valid and has sufficient credits.",
+    "timeout": "💡 The request may be too complex. Try a simpler request or increase the timeout.",
+}
+_DEFAULT_ERROR_GUIDANCE = "💡 Try refreshing the page and running again. If the issue persists, check your API keys and internet connection."
+
+def error_guidance(message):
+    """Pick the guidance for an error message from the first keyword it contains"""
+    match = _ERROR_RE.search(message)
+    return _ERROR_GUIDANCE[match.group(1).lower()] if match else _DEFAULT_ERROR_GUIDANCE
+
+# Styles for log entries rendered as a single HTML block
+_LOG_CSS = """
+<style>
+.log-info { color: #31333F; background: rgba(28, 131, 225, 0.1); border-radius: 0.5rem; padding: 0.5rem 0.75rem; margin: 0.25rem 0; }
+.log-err { color: #7D353B; background: rgba(255, 43, 43, 0.09); border-radius: 0.5rem; padding: 0.5rem 0.75rem; margin: 0.25rem 0; }
+</style>
+"""
 
+# Model per agent role: routing and fetching are light work, only synthesis gets the larger model
+_MODEL_BY_ROLE = {"coordinator": "gpt-4o-mini", "research": "gpt-4o-mini", "synthesis": "gpt-4o"}
+_AGENT_ROLES = {
+    "coordinator_agent": "coordinator",
+    "parallel_research_coordinator": "coordinator",
+    "thinking_agent": "synthesis",
+}
+
+# (input, output) USD per token; estimates without a known model use gpt-4o-mini
+_MODEL_PRICING = {"gpt-4o-mini": (0.00015 / 1000, 0.0006 / 1000), "gpt-4o": (0.0025 / 1000, 0.01 / 1000)}
+_INPUT_COST_PER_TOKEN, _OUTPUT_COST_PER_TOKEN = _MODEL_PRICING["gpt-4o-mini"]
+
+# Cost tracking for multi-agent workflows
 def calculate_agent_cost(messages_count, avg_message_length):
-    """Estimate cost for multi-agent workflow"""
-    # Rough estimation for gpt-4o-mini
-    input_cost_per_token = 0.00015 / 1000
-    output_cost_per_token = 0.0006 / 1000
+    """Estimate cost for multi-agent workflow as LogEntry fields: a display label and the amount in USD"""
+    # Only a length is known here, so use the 4-characters-per-token rule directly
+    estimated_tokens = messages_count * (avg_message_length // 4)
+    estimated_cost = estimated_tokens * (_INPUT_COST_PER_TOKEN + _OUTPUT_COST_PER_TOKEN)
+    
+    return {"cost": f"${estimated_cost:.6f} (≈{estimated_tokens} tokens)", "cost_usd": estimated_cost}
+
+def usage_cost(input_tokens, output_tokens, model=None):
+    """Price SDK-reported token counts for a model, falling back to gpt-4o-mini rates"""
+    input_price, output_price = _MODEL_PRICING.get(model, _MODEL_PRICING["gpt-4o-mini"])
+    return input_tokens * input_price + output_tokens * output_price
+
+def summarize_usage(*run_results):
+    """Sum the token usage the Agents SDK reports across one or more runs"""
+    totals = Counter()
+    for run_result in run_results:
+        usage = getattr(getattr(run_result, "context_wrapper", None), "usage", None)
+        if usage is not None:
+            totals.update(requests=usage.requests, input_tokens=usage.input_tokens, output_tokens=usage.output_tokens)
+    return dict(totals)
+
+def truncate(text, limit):
+    """Cut text to its first limit characters plus an ellipsis, returning it untouched when it already fits"""
+    return text if len(text) <= limit else f"{text[:limit]}..."
+
+def render_log_entry(log_entry, count=1):
+    """Render one execution-log entry as a single HTML-batched markdown block"""
+    suffix = f" ×{count}" if count > 1 else ""
+    parts = [f"{log_entry.icon} <code>[{log_entry.elapsed}]</code> <b>{html.escape(log_entry.agent)}</b>: {html.escape(log_entry.action)}{suffix}"]
+    if log_entry.details:
+        parts.append(f"<div class='log-info'>{html.escape(log_entry.details)}</div>")
+    if log_entry.error:
+        parts.append(f"<div class='log-err'>{html.escape(log_entry.error)}</div>")
+    st.markdown("".join(parts), unsafe_allow_html=True)
+
+def render_step_details(log_entry, agent_models=None):
+    """Render the full details of one execution-log step, with the model its agent ran on when known"""
+    # Show step metadata (similar to ReAct)
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown(f"**Agent:** {log_entry.agent}")
+        model = (agent_models or {}).get(log_entry.agent)
+        if model:
+            st.markdown(f"**Model:** {model}")
+    with col2:
+        st.markdown(f"**API Cost:** {log_entry.cost}")
+        st.markdown(f"**Elapsed:** {log_entry.elapsed}")
+    
+    # Show agent's action/thinking
+    if log_entry.action:
+        st.markdown("**🤖 Agent Action:**")
+        st.info(log_entry.action)
+    
+    # Show tools used (similar to ReAct tool calls)
+    if log_entry.tools_used:
+        st.markdown("**🔧 Tools Used:**")
+        for j, tool in enumerate(log_entry.tools_used):
+            st.markdown(f"**Tool {j+1}: `{tool}`** | Cost: Not available")
+    
+            # Show tool result
+            if log_entry.raw_output:
+                st.success(f"✅ Tool Result: {tool} executed successfully")
     
-    estimated_tokens = messages_count * estimate_tokens("x" * avg_message_length)
-    estimated_cost = estimated_tokens * (input_cost_per_token + output_cost_per_token)
+    # Show step details
+    if log_entry.details:
+        st.markdown("**📋 Step Details:**")
+        st.info(log_entry.details)
     
-    return f"${estimated_cost:.6f} (≈{estimated_tokens} tokens)"
+    # Show raw output in expandable section (like ReAct)
+    if log_entry.raw_output:
+        with st.expander(f"🔍 Raw Output from {log_entry.agent}", expanded=False):
+            st.code(log_entry.raw_output, language="text")
+    
+    # Show step error
+    if log_entry.error:
+        st.error(f"❌ Step Error: {log_entry.error}")
+    
+        # Provide specific error guidance (like ReAct)
+        st.info(error_guidance(log_entry.error))
 
-# Check if exa_py is available
-try:
-    import exa_py
-    EXA_AVAILABLE = True
-except ImportError:
-    EXA_AVAILABLE = False
+def render_execution_log(execution_log):
+    """Render the execution log, collapsing consecutive duplicate entries into one"""
+    for _, group in groupby(execution_log, key=lambda e: (e.agent, e.action, e.status)):
+        entries = list(group)
+        render_log_entry(entries[-1], count=len(entries))
 
-# Check if openai-agents is available
-try:
-    from agents import Agent, Runner, function_tool
-    AGENTS_AVAILABLE = True
-except ImportError:
-    AGENTS_AVAILABLE = False
+def render_failed_run_log(execution_log, detailed=False):
+    """Render the log of a failed run as one collapsed JSON viewer, or per step when detailed"""
+    if detailed:
+        render_execution_log(execution_log)
+    else:
+        st.json([asdict(log_entry) for log_entry in execution_log], expanded=False)
 
-st.markdown("# 🤝 Multi-Agent Orchestration")
-st.markdown("---")
+def paginate(items, page_size, key):
+    """Return the page of items picked on a page slider (latest page by default) and its start offset"""
+    page_count = max(-(-len(items) // page_size), 1)
+    if page_count == 1:
+        return items, 0
+    page = st.select_slider(f"Page ({len(items)} steps)", options=range(1, page_count + 1), value=page_count, key=key)
+    start = (page - 1) * page_size
+    return items[start:start + page_size], start
+
+# Agent team cards per tool mode, listed column by column (three per column)
+_AGENT_CARDS = {
+    "exa": (
+        ("🔍 **Research Specialist**", "General information"),
+        ("🌐 **Exa Web Analyst**", "Real-time web search"),
+        ("🧠 **Parallel Coordinator**", "Manages parallel research"),
+        ("📚 **arXiv Specialist**", "Latest academic papers"),
+        ("🐦 **Twitter Specialist**", "Social discussions"),
+        ("💻 **Papers with Code**", "Implementations & benchmarks"),
+        ("🤔 **Strategic Thinking**", "Deep analysis & synthesis"),
+        ("📊 **Data Analyst**", "Insights from data"),
+        ("✍️ **Content Writer**", "Polished content"),
+    ),
+    "mock": (
+        ("🔍 **Research Specialist (Mock)**", "Sample information"),
+        ("🌐 **Mock Web Analyst**", "Demo web search"),
+        ("🧠 **Parallel Coordinator**", "Manages demo research"),
+        ("📚 **Mock arXiv Specialist**", "Sample academic papers"),
+        ("🐦 **Mock Twitter Specialist**", "Demo social discussions"),
+        ("💻 **Mock Papers with Code**", "Sample implementations"),
+        ("🤔 **Strategic Thinking**", "Deep analysis & synthesis"),
+        ("📊 **Data Analyst**", "Insights from data"),
+        ("✍️ **Content Writer**", "Polished content"),
+    ),
+}
+
+class AgentHints:
+    """Look up hint text by keywords in an agent name; keywords listed earlier take priority"""
+    
+    def __init__(self, hints, default):
+        self.hints = hints
+        self.default = default
+        self.rank = {keyword: i for i, keyword in enumerate(hints)}
+        self.pattern = re.compile("|".join(map(re.escape, hints)))
+    
+    def __call__(self, agent_name):
+        keywords = self.pattern.findall(agent_name)
+        return self.hints[min(keywords, key=self.rank.__getitem__)] if keywords else self.default
+
+_AGENT_TOOL_HINTS = AgentHints({
+    "Exa": "🌐 Web search, Company research, arXiv papers, Twitter, Papers with Code",
+    "Web": "🌐 Web search, Company research, arXiv papers, Twitter, Papers with Code",
+    "Research Specialist": "🔍 Information search, Market data",
+    "arXiv": "📚 arXiv paper search, Academic research",
+    "Twitter": "🐦 Twitter search, Social media analysis",
+    "Papers with Code": "💻 Code implementations, Benchmarks",
+    "Analysis": "📊 Data analysis, Pattern recognition, Strategic thinking",
+    "Analyst": "📊 Data analysis, Pattern recognition, Strategic thinking",
+    "Coordinator": "🤝 Agent handoffs, Task delegation, Workflow management",
+    "Writer": "✍️ Content creation, Report writing",
+    "Writing": "✍️ Content creation, Report writing",
+}, default="📝 Content generation, Creative enhancement")
+
+_AGENT_ROLE_HINTS = AgentHints({
+    "Coordinator": "🎯 **Role**: Manages workflow and delegates to specialized agents",
+    "Exa": "🌐 **Role**: Real-time web search and current information",
+    "Web": "🌐 **Role**: Real-time web search and current information",
+    "Research": "🔍 **Role**: Information gathering and research",
+    "Analysis": "📊 **Role**: Data analysis and strategic insights",
+    "Analyst": "📊 **Role**: Data analysis and strategic insights",
+    "Writer": "✍️ **Role**: Content creation and report writing",
+    "Writing": "✍️ **Role**: Content creation and report writing",
+}, default="🤖 **Role**: Specialized task execution")
+
+@st.fragment
+def render_agent_team(tool_mode):
+    """Render the agent team cards for the given tool mode"""
+    st.markdown(f"### 👥 Meet Your Agent Team ({tool_mode.upper()} Mode)")
+    
+    cols = st.columns(3)
+    for i, (title, subtitle) in enumerate(_AGENT_CARDS[tool_mode]):
+        cols[i // 3].info(f"{title}\n{subtitle}")
+    
+    if tool_mode == "exa":
+        st.success("🤝 **Project Coordinator** - Manages the full team and coordinates handoffs")
+    else:
+        st.warning("🤝 **Project Coordinator** - Using demonstration data for educational purposes")
+
+# Example requests shown under "Try These Multi-Agent Examples!"
+_EXA_EXAMPLE_REQUESTS = (
+    "Research the latest developments in diffusion models across arXiv, Twitter discussions, and Papers with Code. Provide strategic analysis on emerging trends and implementation opportunities.",
+    "Investigate current multimodal AI research from academic papers, social media expert opinions, and code repositories. Synthesize findings with deep analytical insights.",
+    "Study recent advances in reinforcement learning from human feedback (RLHF) across all research platforms. Generate strategic recommendations for practical applications.",
+    "Research emerging trends in computer vision and foundation models. Gather insights from papers, community discussions, and implementations for comprehensive analysis.",
+    "Explore the latest in AI safety and alignment research across academic and social platforms. Provide thoughtful analysis on current approaches and future directions."
+)
+
+_MOCK_EXAMPLE_REQUESTS = (
+    "Research artificial intelligence and machine learning trends. Provide analysis with insights from multiple perspectives.",
+    "Investigate renewable energy technologies and market opportunities. Analyze data from different research angles.",
+    "Study quantum computing developments and potential applications. Generate strategic recommendations.",
+    "Research biotechnology advances and their implications. Provide comprehensive analysis and insights.",
+    "Explore space exploration technologies and future missions. Analyze trends and opportunities."
+)
+
+# Code samples displayed in the "Want to see the multi-agent code?" section
+_AGENTS_SDK_CODE = """
+from agents import Agent, Runner, function_tool
+import asyncio
+
+# Define tools
+@function_tool
+def search_information(query: str) -> str:
+    # Your search logic here
+    return f"Research findings on {query}"
+
+@function_tool
+def analyze_data(data: str) -> str:
+    # Your analysis logic here
+    return f"Analysis results: {data}"
+
+# Create specialized agents
+research_agent = Agent(
+    name="Research Specialist",
+    instructions="You are a research expert. Find comprehensive information.",
+    tools=[search_information]
+)
+
+analysis_agent = Agent(
+    name="Data Analyst", 
+    instructions="You analyze data and provide insights.",
+    tools=[analyze_data]
+)
+
+writing_agent = Agent(
+    name="Content Writer",
+    instructions="You create polished, engaging content.",
+    tools=[]
+)
+
+# Coordinator agent with handoffs
+coordinator_agent = Agent(
+    name="Project Coordinator",
+    instructions="Coordinate between specialists based on the task.",
+    handoffs=[research_agent, analysis_agent, writing_agent]
+)
+
+# Run the multi-agent workflow
+async def main():
+    result = await Runner.run(
+        coordinator_agent, 
+        "Research renewable energy and create a report"
+    )
+    print(result.final_output)
+
+# From synchronous code (e.g. a Streamlit button handler), drive the
+# async API with one event loop and a timeout instead of run_sync
+result = asyncio.run(asyncio.wait_for(
+    Runner.run(coordinator_agent, "Your request here"),
+    timeout=60
+))
+print(result.final_output)
+"""
+
+_EXA_INTEGRATION_CODE = """
+import asyncio
+import exa_py
+import os
+from agents import Agent, Runner, function_tool
+
+# Exa-powered research tools
+@function_tool
+def exa_web_search(query: str) -> str:
+    \"\"\"Real-time web search using Exa AI\"\"\"
+    exa = exa_py.Exa(api_key=os.environ["EXA_API_KEY"])
+    results = exa.search(query=query, num_results=3, text=True, highlights=True)
+    
+    search_summary = f"Web search results for '{query}':\\n\\n"
+    for i, result in enumerate(results.results, 1):
+        search_summary += f"{i}. **{result.title}**\\n"
+        search_summary += f"   URL: {result.url}\\n"
+        if result.highlights:
+            search_summary += f"   Key info: {result.highlights[0][:200]}...\\n"
+        search_summary += "\\n"
+    return search_summary
+
+@function_tool
+def exa_arxiv_search(topic: str) -> str:
+    \"\"\"Search for latest papers on arXiv using Exa AI\"\"\"
+    exa = exa_py.Exa(api_key=os.environ["EXA_API_KEY"])
+    results = exa.search(
+        query=f"{topic} site:arxiv.org",
+        num_results=5,
+        text=True,
+        include_domains=["arxiv.org"]
+    )
+    
+    papers_summary = f"Latest arXiv papers on '{topic}':\\n\\n"
+    for i, result in enumerate(results.results, 1):
+        papers_summary += f"{i}. **{result.title}**\\n"
+        papers_summary += f"   arXiv URL: {result.url}\\n"
+        if result.text:
+            papers_summary += f"   Abstract: {result.text[:250]}...\\n"
+        papers_summary += "\\n"
+    return papers_summary
+
+@function_tool
+def exa_company_research(company_name: str) -> str:
+    \"\"\"Research companies using Exa AI\"\"\"
+    exa = exa_py.Exa(api_key=os.environ["EXA_API_KEY"])
+    results = exa.search(
+        query=f"{company_name} company business model revenue",
+        num_results=3,
+        text=True,
+        category="company"
+    )
+    
+    research_summary = f"Company research for '{company_name}':\\n\\n"
+    for i, result in enumerate(results.results, 1):
+        research_summary += f"{i}. **{result.title}**\\n"
+        research_summary += f"   Source: {result.url}\\n"
+        if result.text:
+            research_summary += f"   Info: {result.text[:300]}...\\n"
+        research_summary += "\\n"
+    return research_summary
+
+# Create specialized Exa-powered agents
+web_research_agent = Agent(
+    name="Exa Web Research Specialist",
+    instructions=\"\"\"You are a web research specialist powered by Exa AI.
+    Your job is to find real-time information from the web, analyze current trends,
+    and provide up-to-date insights. Always use Exa search for current information.\"\"\",
+    tools=[exa_web_search, exa_company_research]
+)
+
+academic_research_agent = Agent(
+    name="Academic Research Specialist",
+    instructions=\"\"\"You are an academic research specialist powered by Exa AI.
+    Your job is to find the latest research papers, analyze academic trends,
+    and summarize cutting-edge findings from arXiv.\"\"\",
+    tools=[exa_arxiv_search]
+)
+
+synthesis_agent = Agent(
+    name="Research Synthesis Analyst",
+    instructions=\"\"\"You are a synthesis analyst. Your job is to:
+    1. Take research from multiple agents (web, academic, etc.)
+    2. Identify patterns and connections across different sources
+    3. Provide comprehensive analysis and strategic insights
+    4. Create actionable recommendations based on all findings\"\"\",
+    tools=[]
+)
+
+# Orchestrate in Python rather than through LLM handoffs: fan out to the
+# independent specialists concurrently, then synthesize their findings
+async def research_with_exa(topic: str):
+    web_result, academic_result = await asyncio.gather(
+        Runner.run(web_research_agent, topic),
+        Runner.run(academic_research_agent, topic)
+    )
+    combined = f"Web findings:\\n{web_result.final_output}\\n\\nAcademic findings:\\n{academic_result.final_output}"
+    result = await Runner.run(synthesis_agent, combined)
+    return result.final_output
 
-st.markdown("""
+# Run the research
+print(asyncio.run(research_with_exa("Research the latest developments in large language models")))
+"""
+
+# Long-form page copy, kept out of the page body
+_INTRO_MD = """
 ### 🎯 Specialized AI Team Working Together
 Multiple expert AIs using OpenAI Agents SDK:
 
@@ -49,73 +471,381 @@ Multiple expert AIs using OpenAI Agents SDK:
 🔹 **Workflow Coordination** - Intelligent task routing and result synthesis  
 
 **⚡ Powered by OpenAI Agents SDK**: Official framework for production multi-agent systems.
-""")
+"""
 
-if not AGENTS_AVAILABLE:
-    st.error("""
-    ❌ **OpenAI Agents SDK not available**
+_AGENTS_MISSING_MD = """
+❌ **OpenAI Agents SDK not available**
+
+To use this demo, you need to install the OpenAI Agents SDK:
+```bash
+pip install openai-agents
+```
+
+This is a powerful framework for building multi-agent workflows!
+"""
+
+_WHAT_IS_EXA_MD = """
+**Exa AI** is a next-generation search engine designed for AI applications:
+
+🧠 **AI-Native Search**: Unlike Google's keyword matching, Exa understands meaning and context
+
+🎯 **Specialized Searches**: 
+- Company research with business insights
+- Academic papers from arXiv
+- Social media discussions from Twitter/X
+- Code implementations from Papers with Code
+
+📊 **Structured Results**: Returns clean, formatted data perfect for AI processing
+
+⚡ **Real-Time**: Get current information, not just training data
+
+💡 **Try it yourself**: [Exa Playground](https://dashboard.exa.ai/playground/search)
+"""
+
+_EXA_BENEFITS_MD = """
+**🚀 Key Benefits of Exa in Multi-Agent Systems:**
+
+**🔄 Parallel Research**: Multiple agents can search different sources simultaneously:
+- One agent searches web sources
+- Another searches academic papers  
+- Third agent searches social media discussions
+- Fourth agent searches code repositories
+
+**🎯 Specialized Expertise**: Each agent becomes an expert in their domain:
+- **Web Agent**: Current news, trends, company information
+- **Academic Agent**: Latest research papers, scientific developments
+- **Social Agent**: Public opinion, expert discussions
+- **Code Agent**: Implementation examples, benchmarks
+
+**🧠 Intelligent Synthesis**: Strategic thinking agent combines all findings:
+- Identifies patterns across different sources
+- Connects academic research to practical applications
+- Provides comprehensive analysis and recommendations
+
+**⚡ Real-Time Intelligence**: Unlike static training data, Exa provides:
+- Current market conditions
+- Latest research developments
+- Recent news and trends
+- Up-to-date social discussions
+"""
+
+_EXA_SETUP_MD = """
+**🔑 Setup Instructions:**
+1. **Install packages**: `pip install exa-py openai-agents`
+2. **Get API keys**: 
+   - Exa API key from [exa.ai](https://exa.ai/)
+   - OpenAI API key from [platform.openai.com](https://platform.openai.com/)
+3. **Set environment variables**:
+   ```bash
+   export EXA_API_KEY="your-exa-key-here"
+   export OPENAI_API_KEY="your-openai-key-here"
+   ```
+4. **Run your multi-agent system** with real-time intelligence!
+"""
+
+# Check if exa_py is available; it is only imported once an Exa client is needed
+EXA_AVAILABLE = find_spec("exa_py") is not None
+
+# Check if openai-agents is available
+try:
+    from agents import Agent, ItemHelpers, ModelSettings, RunHooks, Runner, function_tool
+    from openai.types.responses import ResponseTextDeltaEvent
+    AGENTS_AVAILABLE = True
+except ImportError:
+    RunHooks = object
+    AGENTS_AVAILABLE = False
+
+class AgentUsageHooks(RunHooks):
+    """Attribute SDK-reported token usage and tool calls to the agent that spent them"""
     
-    To use this demo, you need to install the OpenAI Agents SDK:
-    ```bash
-    pip install openai-agents
-    ```
+    def __init__(self, events=None):
+        self.by_agent = {}
+        self.models = {}
+        self._marks = {}
+        # Optional asyncio.Queue of (monotonic time, agent name, action) for the live log
+        self.events = events
     
-    This is a powerful framework for building multi-agent workflows!
-    """)
-    st.stop()
+    def _emit(self, agent, action):
+        # The live log is best effort: never make the run wait on the UI
+        if self.events is not None and not self.events.full():
+            self.events.put_nowait((time.monotonic(), agent.name, action))
+    
+    def _charge(self, context, agent):
+        # Usage is tracked per run context, so concurrent runs can share one instance;
+        # whatever a run spent since its previous hook event belongs to the acting agent
+        usage = context.usage
+        mark = (usage.requests, usage.input_tokens, usage.output_tokens)
+        last = self._marks.get(id(context), (0, 0, 0))
+        self._marks[id(context)] = mark
+        totals = self.by_agent.setdefault(agent.name, Counter())
+        self.models[agent.name] = agent.model
+        totals.update(requests=mark[0] - last[0], input_tokens=mark[1] - last[1], output_tokens=mark[2] - last[2])
+        return totals
+    
+    async def on_agent_start(self, context, agent):
+        self._charge(context, agent)
+    
+    async def on_tool_start(self, context, agent, tool):
+        self._charge(context, agent)["tool_calls"] += 1
+        self._emit(agent, f"Calling tool {tool.name}")
+    
+    async def on_tool_end(self, context, agent, tool, result):
+        self._charge(context, agent)
+    
+    async def on_handoff(self, context, from_agent, to_agent):
+        self._charge(context, from_agent)["handoffs"] += 1
+        self._emit(from_agent, f"Handing off to {to_agent.name}")
+    
+    async def on_agent_end(self, context, agent, output):
+        self._charge(context, agent)
 
-# Check for API key from session state
-api_key = st.session_state.get("openai_api_key")
+def keyword_pattern(keywords):
+    """Compile keywords into one case-insensitive alternation that prefers the longest match"""
+    return re.compile("|".join(map(re.escape, sorted(keywords, key=len, reverse=True))), re.IGNORECASE)
 
-if api_key:
-    # Set the API key for the agents SDK
-    os.environ["OPENAI_API_KEY"] = api_key
+# Mock data for the fallback research tools, matched with one precompiled pattern each
+_MOCK_SEARCH_RESULTS = {
+    "climate change": "Climate change refers to long-term shifts in global temperatures and weather patterns. Human activities, particularly burning fossil fuels, are the main driver.",
+    "artificial intelligence": "AI is the simulation of human intelligence in machines. It includes machine learning, deep learning, and natural language processing.",
+    "renewable energy": "Renewable energy comes from sources that naturally replenish, like solar, wind, hydro, and geothermal power.",
+    "space exploration": "Space exploration involves the discovery and exploration of celestial structures in outer space by means of space technology.",
+    "quantum computing": "Quantum computing uses quantum mechanics to process information in ways that classical computers cannot.",
+    "biotechnology": "Biotechnology uses living systems and organisms to develop products and technologies for various applications."
+}
+_SEARCH_TOPIC_RE = keyword_pattern(_MOCK_SEARCH_RESULTS)
+
+_MOCK_MARKET_DATA = {
+    "tech": "Tech sector showing 12% growth, driven by AI and cloud computing innovations",
+    "energy": "Renewable energy market expanding rapidly with 25% year-over-year growth",
+    "finance": "Financial markets showing stability with emerging fintech opportunities",
+    "healthcare": "Healthcare technology advancing with personalized medicine trends",
+    "education": "EdTech sector growing with increased demand for online learning solutions"
+}
+_MARKET_SECTOR_RE = keyword_pattern(_MOCK_MARKET_DATA)
+
+# Mock analyses are handed out in a fixed rotation so demo runs are repeatable
+_MOCK_ANALYSIS_CYCLE = cycle((
+    "shows strong positive trends with 15% growth potential",
+    "indicates moderate risk with stable long-term outlook",
+    "demonstrates high innovation potential in emerging markets",
+    "reveals significant opportunities for improvement and optimization",
+    "suggests diversification strategies would be beneficial"
+))
+
+@st.cache_resource
+def get_exa_client(api_key):
+    """Share one Exa client per API key across sessions and tool calls"""
+    import exa_py
+    return exa_py.Exa(api_key=api_key)
+
+class ExaCircuitBreaker:
+    """Stop calling Exa for a cooldown period after repeated failures in a short window"""
     
-    # Get EXA API key from session state
-    exa_api_key = st.session_state.get("exa_api_key")
+    def __init__(self, threshold=3, window=30.0, cooldown=60.0):
+        self.threshold = threshold
+        self.window = window
+        self.cooldown = cooldown
+        self.failures = deque()
+        self.open_until = 0.0
+        # Shared by every session's worker threads
+        self._lock = threading.Lock()
     
-    # Tool selection toggle
-    st.markdown("### 🔧 Tool Configuration")
-    use_exa = st.toggle(
-        "Use Exa AI Tools (Real-time research)", 
-        value=True,  # Default to True for multi-agent since it's more powerful
-        help="Toggle between mock tools and real Exa AI tools for research",
-        disabled=not (EXA_AVAILABLE and exa_api_key)
+    def is_open(self):
+        with self._lock:
+            return time.monotonic() < self.open_until
+    
+    def record_success(self):
+        with self._lock:
+            self.failures.clear()
+    
+    def record_failure(self):
+        with self._lock:
+            now = time.monotonic()
+            self.failures.append(now)
+            while self.failures and now - self.failures[0] > self.window:
+                self.failures.popleft()
+            if len(self.failures) >= self.threshold:
+                self.open_until = now + self.cooldown
+                self.failures.clear()
+
+@st.cache_resource
+def exa_circuit_breaker():
+    """Share one circuit breaker across sessions, since they all hit the same Exa API"""
+    return ExaCircuitBreaker()
+
+# Exa calls: attempts per search on network errors, process-wide request cap, and what tools report while the breaker is open
+_EXA_ATTEMPTS = 2
+_EXA_MAX_CONCURRENCY = int(os.environ.get("EXA_MAX_CONCURRENCY", "8"))
+_EXA_CIRCUIT_OPEN_MESSAGE = "Exa is temporarily unavailable after repeated errors, so no results were retrieved. Continue without this source."
+_EXA_NO_RESULTS_MESSAGE = "No Exa results are available for this search. Continue without this source."
+
+@st.cache_resource
+def exa_bulkhead():
+    """Share one semaphore across sessions so bursts of searches queue instead of piling onto the Exa API"""
+    return threading.BoundedSemaphore(_EXA_MAX_CONCURRENCY)
+
+class RequestCollapser:
+    """Let concurrent identical calls share one in-flight result instead of each making the request"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight = {}
+    
+    def run(self, key, fn, *args):
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            return future.result()
+        
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+@st.cache_resource
+def exa_collapser():
+    """Share one request collapser across sessions, in front of the Exa bulkhead"""
+    return RequestCollapser()
+
+# Worker threads for blocking Exa calls, shared by every run and session
+_WORKER_POOL_SIZE = int(os.getenv("THREAD_POOL_SIZE", "32"))
+
+@st.cache_resource
+def worker_pool():
+    """Share one warm thread pool across runs; asyncio.run would otherwise build and tear down a default executor per click"""
+    return ThreadPoolExecutor(max_workers=_WORKER_POOL_SIZE, thread_name_prefix="agents")
+
+async def in_worker(fn, *args):
+    """Run a blocking call on the shared worker pool without blocking the event loop"""
+    return await asyncio.get_running_loop().run_in_executor(worker_pool(), fn, *args)
+
+# Leading filler dropped when normalizing a query for the search cache; the rest keeps its
+# word order and punctuation, which carry meaning ("Paris to London", "C++")
+_QUERY_FILLER_RE = re.compile(r"^(?:find|search(?: for)?|look up|show me|tell me(?: about)?)\s+")
+
+# Tool output re-enters every downstream prompt, so each hit is cut to one short line
+_EXA_SNIPPET_CHARS = 120
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s")
+
+def compress_hit(result):
+    """Reduce an Exa hit to one line: title, URL and the first sentence of its text"""
+    snippet = " ".join(_SENTENCE_END_RE.split(result.text.strip(), maxsplit=1)[0].split()) if result.text else ""
+    return f"- {result.title} ({result.url}): {snippet}" if snippet else f"- {result.title} ({result.url})"
+
+def normalize_query(query):
+    """Lower-case a query, collapse its whitespace and drop leading filler, so trivially reworded repeats share a cache entry"""
+    query = " ".join(query.lower().split())
+    return _QUERY_FILLER_RE.sub("", query) or query
+
+def exa_search(exa, query, include_domains, num_results, max_characters):
+    """Search Exa, reusing cached hits for any query that normalizes to the same text"""
+    return cached_exa_search(exa, query, normalize_query(query), include_domains, num_results, max_characters)
+
+@st.cache_data(ttl=15 * 60, max_entries=256, show_spinner=False)
+def cached_exa_search(_exa, _query, query_key, include_domains, num_results, max_characters):
+    """Search Exa and fetch page text truncated server-side, caching hits per query key and domain filter"""
+    # A cache miss that is already being fetched by another agent or session waits for that request
+    return exa_collapser().run(
+        (query_key, include_domains, num_results, max_characters),
+        fetch_exa_hits, _exa, _query, include_domains, num_results, max_characters
     )
+
+def fetch_exa_hits(exa, query, include_domains, num_results, max_characters):
+    """Call the Exa API, retrying network errors and holding a bulkhead slot per attempt"""
+    for attempt in range(_EXA_ATTEMPTS):
+        try:
+            # Runs in a worker thread, so waiting for a slot never blocks an event loop
+            with exa_bulkhead():
+                results = exa.search_and_contents(
+                    query,
+                    num_results=num_results,
+                    use_autoprompt=True,
+                    include_domains=list(include_domains) or None,
+                    text={"max_characters": max_characters}
+                )
+            break
+        except OSError:
+            # Network errors (requests raises OSError subclasses) get one quick retry
+            if attempt == _EXA_ATTEMPTS - 1:
+                raise
+            time.sleep(0.2 * 2 ** attempt)
+    return [
+        SimpleNamespace(id=result.id, title=result.title, url=result.url, text=result.text)
+        for result in results.results
+    ]
+
+# Each search is (subheading or None, query, include_domains, num_results)
+async def guarded_exa_search(label, fallback, heading, *searches):
+    """Run one tool call's Exa searches behind the availability checks and circuit breaker, listing the hits under a heading"""
+    if not EXA_AVAILABLE:
+        return f"Exa {label} not available. {fallback}"
     
-    if use_exa and EXA_AVAILABLE and exa_api_key:
-        os.environ["EXA_API_KEY"] = exa_api_key
-        st.success("✅ **Exa Tools Enabled**: Real-time web search, company research, academic papers, and more!")
-        tool_mode = "exa"
+    exa_api_key = os.environ.get("EXA_API_KEY")
+    if not exa_api_key:
+        return f"EXA_API_KEY not found. {fallback}"
+    
+    breaker = exa_circuit_breaker()
+    if breaker.is_open():
+        return _EXA_CIRCUIT_OPEN_MESSAGE
+    
+    try:
+        exa = get_exa_client(exa_api_key)
+        # Independent searches run side by side
+        outcomes = await asyncio.gather(
+            *(in_worker(exa_search, exa, query, domains, n, _EXA_SNIPPET_CHARS) for _, query, domains, n in searches),
+            return_exceptions=True
+        )
+    except Exception as e:
+        outcomes = [e] * len(searches)
+    
+    # One outcome per tool call: any failed search counts, so a source that keeps failing
+    # trips the breaker even while the others succeed. Errors are logged, not shown to the model.
+    failures = [outcome for outcome in outcomes if isinstance(outcome, Exception)]
+    if failures:
+        breaker.record_failure()
+        for failure in failures:
+            logger.warning("Exa %s failed: %r", label, failure)
+        if len(failures) == len(outcomes):
+            return _EXA_NO_RESULTS_MESSAGE
     else:
-        if use_exa and not EXA_AVAILABLE:
-            st.warning("📦 **Install Exa**: Run `pip install exa-py` to enable Exa tools")
-        elif use_exa and not exa_api_key:
-            st.warning("🔑 **EXA API Key Required**: Add your EXA API key in the sidebar")
-        st.info("🔧 **Mock Tools Active**: Using demonstration tools with sample data")
-        tool_mode = "mock"
+        breaker.record_success()
     
-    # Define tools that agents can use based on mode
-    if tool_mode == "exa":
-        # Real Exa tools (existing functions)
-        pass  # The exa functions are already defined above
+    lines = [heading]
+    seen_urls = set()
+    for (subheading, *_), outcome in zip(searches, outcomes):
+        if subheading:
+            lines.append(f"## {subheading}")
+        if isinstance(outcome, Exception):
+            lines.append("No results available.")
+            continue
+        
+        # The same page can surface in several searches; list it once
+        for result in outcome:
+            if result.url not in seen_urls:
+                seen_urls.add(result.url)
+                lines.append(compress_hit(result))
     
-    # Mock tools for fallback
+    return "\n".join(lines)
+
+@st.cache_resource
+def build_tools():
+    """Create the function tools once per process; agents reference them by name"""
     @function_tool
     def search_information(query: str) -> str:
         """Search for information on any topic (mock data)"""
-        search_results = {
-            "climate change": "Climate change refers to long-term shifts in global temperatures and weather patterns. Human activities, particularly burning fossil fuels, are the main driver.",
-            "artificial intelligence": "AI is the simulation of human intelligence in machines. It includes machine learning, deep learning, and natural language processing.",
-            "renewable energy": "Renewable energy comes from sources that naturally replenish, like solar, wind, hydro, and geothermal power.",
-            "space exploration": "Space exploration involves the discovery and exploration of celestial structures in outer space by means of space technology.",
-            "quantum computing": "Quantum computing uses quantum mechanics to process information in ways that classical computers cannot.",
-            "biotechnology": "Biotechnology uses living systems and organisms to develop products and technologies for various applications."
-        }
-        
-        for key, result in search_results.items():
-            if key.lower() in query.lower():
-                return f"📖 Mock research findings on '{query}': {result}"
+        match = _SEARCH_TOPIC_RE.search(query)
+        if match:
+            return f"📖 Mock research findings on '{query}': {_MOCK_SEARCH_RESULTS[match.group(0).lower()]}"
         
         return f"📖 Mock general information about '{query}': This is an interesting topic with various applications and implications."
     
@@ -145,229 +875,104 @@ if api_key:
         return f"💻 Mock Papers with Code for '{topic}': Sample implementations, benchmarks, and code repositories related to this topic. This is demonstration data."
     
     @function_tool
-    def exa_web_search(query: str) -> str:
+    async def exa_web_search(query: str) -> str:
         """Perform real-time web search using Exa AI"""
-        if not EXA_AVAILABLE:
-            return "Exa search not available. Install exa-py package and add EXA_API_KEY to use real web search."
-        
-        exa_api_key = os.environ.get("EXA_API_KEY")
-        if not exa_api_key:
-            return "EXA_API_KEY not found in environment variables. Add your Exa API key to enable real web search."
-        
-        try:
-            exa = exa_py.Exa(api_key=exa_api_key)
-            results = exa.search(
-                query=query,
-                num_results=3,
-                use_autoprompt=True
-            )
-            
-            # Get content for the results
-            try:
-                contents = exa.get_contents([result.id for result in results.results])
-                content_map = {content.id: content.text for content in contents.contents if content.text}
-            except:
-                content_map = {}
-            
-            search_summary = f"Exa web search results for '{query}':\n\n"
-            for i, result in enumerate(results.results, 1):
-                search_summary += f"{i}. **{result.title}**\n"
-                search_summary += f"   URL: {result.url}\n"
-                if result.id in content_map and content_map[result.id]:
-                    search_summary += f"   Summary: {content_map[result.id][:200]}...\n"
-                search_summary += "\n"
-            
-            return search_summary
-            
-        except Exception as e:
-            return f"Exa search error: {str(e)}. Using fallback search instead."
+        return await guarded_exa_search(
+            "search",
+            "Install exa-py and add EXA_API_KEY to use real web search.",
+            f"Exa web search results for '{query}':",
+            (None, query, (), 3)
+        )
     
     @function_tool
-    def exa_company_research(company_name: str) -> str:
+    async def exa_company_research(company_name: str) -> str:
         """Research companies using Exa AI"""
-        if not EXA_AVAILABLE:
-            return f"Exa research not available. Mock data: {company_name} is a company with various business operations."
-        
-        exa_api_key = os.environ.get("EXA_API_KEY")
-        if not exa_api_key:
-            return f"EXA_API_KEY not found. Mock data: {company_name} appears to be an established company in its sector."
-        
-        try:
-            exa = exa_py.Exa(api_key=exa_api_key)
-            results = exa.search(
-                query=f"{company_name} company business model revenue",
-                num_results=3,
-                use_autoprompt=True
-            )
-            
-            # Get content for the results
-            try:
-                contents = exa.get_contents([result.id for result in results.results])
-                content_map = {content.id: content.text for content in contents.contents if content.text}
-            except:
-                content_map = {}
-            
-            research_summary = f"Exa company research for '{company_name}':\n\n"
-            for i, result in enumerate(results.results, 1):
-                research_summary += f"{i}. **{result.title}**\n"
-                research_summary += f"   Source: {result.url}\n"
-                if result.id in content_map and content_map[result.id]:
-                    research_summary += f"   Info: {content_map[result.id][:300]}...\n"
-                research_summary += "\n"
-            
-            return research_summary
-            
-        except Exception as e:
-            return f"Exa company research error: {str(e)}. Using fallback data."
+        return await guarded_exa_search(
+            "company research",
+            f"Mock data: {company_name} appears to be an established company in its sector.",
+            f"Exa company research for '{company_name}':",
+            (None, f"{company_name} company business model revenue", (), 3)
+        )
     
     @function_tool
-    def exa_arxiv_search(topic: str) -> str:
+    async def exa_multi_source_research(topic: str) -> str:
+        """Research a topic across the web, arXiv papers and company sources at once using Exa AI"""
+        return await guarded_exa_search(
+            "multi-source research",
+            f"Mock data: {topic} is an active area across web, academic and business sources.",
+            f"Exa multi-source research on '{topic}':",
+            ("Web results", topic, (), 3),
+            ("arXiv papers", f"{topic} site:arxiv.org", ("arxiv.org",), 5),
+            ("Company sources", f"{topic} company business model revenue", (), 3)
+        )
+    
+    @function_tool
+    async def exa_arxiv_search(topic: str) -> str:
         """Search for latest papers on arXiv using Exa AI"""
-        if not EXA_AVAILABLE:
-            return f"Exa arXiv search not available. Mock data: Found several papers related to {topic} on arXiv."
-        
-        exa_api_key = os.environ.get("EXA_API_KEY")
-        if not exa_api_key:
-            return f"EXA_API_KEY not found. Mock data: Recent arXiv papers on {topic} show active research."
-        
-        try:
-            exa = exa_py.Exa(api_key=exa_api_key)
-            results = exa.search(
-                query=f"{topic} site:arxiv.org",
-                num_results=5,
-                use_autoprompt=True,
-                include_domains=["arxiv.org"]
-            )
-            
-            # Get content for the results
-            try:
-                contents = exa.get_contents([result.id for result in results.results])
-                content_map = {content.id: content.text for content in contents.contents if content.text}
-            except:
-                content_map = {}
-            
-            papers_summary = f"Latest arXiv papers on '{topic}':\n\n"
-            for i, result in enumerate(results.results, 1):
-                papers_summary += f"{i}. **{result.title}**\n"
-                papers_summary += f"   arXiv URL: {result.url}\n"
-                if result.id in content_map and content_map[result.id]:
-                    papers_summary += f"   Abstract: {content_map[result.id][:250]}...\n"
-                papers_summary += "\n"
-            
-            return papers_summary
-            
-        except Exception as e:
-            return f"Exa arXiv search error: {str(e)}. Using fallback data."
+        return await guarded_exa_search(
+            "arXiv search",
+            f"Mock data: Recent arXiv papers on {topic} show active research.",
+            f"Latest arXiv papers on '{topic}':",
+            (None, f"{topic} site:arxiv.org", ("arxiv.org",), 5)
+        )
     
     @function_tool
-    def exa_twitter_search(topic: str) -> str:
+    async def exa_twitter_search(topic: str) -> str:
         """Search for latest tweets and discussions on Twitter using Exa AI"""
-        if not EXA_AVAILABLE:
-            return f"Exa Twitter search not available. Mock data: Found recent discussions about {topic} on Twitter."
-        
-        exa_api_key = os.environ.get("EXA_API_KEY")
-        if not exa_api_key:
-            return f"EXA_API_KEY not found. Mock data: Twitter shows active discussions about {topic}."
-        
-        try:
-            exa = exa_py.Exa(api_key=exa_api_key)
-            results = exa.search(
-                query=f"{topic} site:twitter.com OR site:x.com",
-                num_results=5,
-                use_autoprompt=True,
-                include_domains=["twitter.com", "x.com"]
-            )
-            
-            # Get content for the results
-            try:
-                contents = exa.get_contents([result.id for result in results.results])
-                content_map = {content.id: content.text for content in contents.contents if content.text}
-            except:
-                content_map = {}
-            
-            twitter_summary = f"Latest Twitter discussions on '{topic}':\n\n"
-            for i, result in enumerate(results.results, 1):
-                twitter_summary += f"{i}. **{result.title}**\n"
-                twitter_summary += f"   Tweet URL: {result.url}\n"
-                if result.id in content_map and content_map[result.id]:
-                    twitter_summary += f"   Content: {content_map[result.id][:200]}...\n"
-                twitter_summary += "\n"
-            
-            return twitter_summary
-            
-        except Exception as e:
-            return f"Exa Twitter search error: {str(e)}. Using fallback data."
+        return await guarded_exa_search(
+            "Twitter search",
+            f"Mock data: Twitter shows active discussions about {topic}.",
+            f"Latest Twitter discussions on '{topic}':",
+            (None, f"{topic} site:twitter.com OR site:x.com", ("twitter.com", "x.com"), 5)
+        )
     
     @function_tool
-    def exa_paperswithcode_search(topic: str) -> str:
+    async def exa_paperswithcode_search(topic: str) -> str:
         """Search for latest papers and code implementations on Papers with Code using Exa AI"""
-        if not EXA_AVAILABLE:
-            return f"Exa Papers with Code search not available. Mock data: Found implementations for {topic}."
-        
-        exa_api_key = os.environ.get("EXA_API_KEY")
-        if not exa_api_key:
-            return f"EXA_API_KEY not found. Mock data: Papers with Code shows recent work on {topic}."
-        
-        try:
-            exa = exa_py.Exa(api_key=exa_api_key)
-            results = exa.search(
-                query=f"{topic} site:paperswithcode.com",
-                num_results=5,
-                use_autoprompt=True,
-                include_domains=["paperswithcode.com"]
-            )
-            
-            # Get content for the results
-            try:
-                contents = exa.get_contents([result.id for result in results.results])
-                content_map = {content.id: content.text for content in contents.contents if content.text}
-            except:
-                content_map = {}
-            
-            pwc_summary = f"Latest Papers with Code on '{topic}':\n\n"
-            for i, result in enumerate(results.results, 1):
-                pwc_summary += f"{i}. **{result.title}**\n"
-                pwc_summary += f"   PwC URL: {result.url}\n"
-                if result.id in content_map and content_map[result.id]:
-                    pwc_summary += f"   Details: {content_map[result.id][:250]}...\n"
-                pwc_summary += "\n"
-            
-            return pwc_summary
-            
-        except Exception as e:
-            return f"Exa Papers with Code search error: {str(e)}. Using fallback data."
+        return await guarded_exa_search(
+            "Papers with Code search",
+            f"Mock data: Papers with Code shows recent work on {topic}.",
+            f"Latest Papers with Code on '{topic}':",
+            (None, f"{topic} site:paperswithcode.com", ("paperswithcode.com",), 5)
+        )
     
     @function_tool
     def analyze_data(data: str) -> str:
         """Analyze data and provide insights"""
-        analysis_types = [
-            "shows strong positive trends with 15% growth potential",
-            "indicates moderate risk with stable long-term outlook", 
-            "demonstrates high innovation potential in emerging markets",
-            "reveals significant opportunities for improvement and optimization",
-            "suggests diversification strategies would be beneficial"
-        ]
-        
-        analysis = random.choice(analysis_types)
+        analysis = next(_MOCK_ANALYSIS_CYCLE)
         return f"Analysis of the provided data: {analysis}. Recommendation: Consider strategic implementation with careful monitoring."
     
     @function_tool
     def get_market_data(topic: str) -> str:
         """Get market data and trends"""
-        market_data = {
-            "tech": "Tech sector showing 12% growth, driven by AI and cloud computing innovations",
-            "energy": "Renewable energy market expanding rapidly with 25% year-over-year growth",
-            "finance": "Financial markets showing stability with emerging fintech opportunities",
-            "healthcare": "Healthcare technology advancing with personalized medicine trends",
-            "education": "EdTech sector growing with increased demand for online learning solutions"
-        }
-        
-        for key, data in market_data.items():
-            if key.lower() in topic.lower():
-                return f"Market data for {topic}: {data}"
+        match = _MARKET_SECTOR_RE.search(topic)
+        if match:
+            return f"Market data for {topic}: {_MOCK_MARKET_DATA[match.group(0).lower()]}"
         
         return f"Market data for {topic}: Steady growth with emerging opportunities in digital transformation."
     
+    return {
+        "search_information": search_information,
+        "mock_exa_web_search": mock_exa_web_search,
+        "mock_exa_company_research": mock_exa_company_research,
+        "mock_exa_arxiv_search": mock_exa_arxiv_search,
+        "mock_exa_twitter_search": mock_exa_twitter_search,
+        "mock_exa_paperswithcode_search": mock_exa_paperswithcode_search,
+        "exa_web_search": exa_web_search,
+        "exa_company_research": exa_company_research,
+        "exa_multi_source_research": exa_multi_source_research,
+        "exa_arxiv_search": exa_arxiv_search,
+        "exa_twitter_search": exa_twitter_search,
+        "exa_paperswithcode_search": exa_paperswithcode_search,
+        "analyze_data": analyze_data,
+        "get_market_data": get_market_data,
+    }
+
+@st.cache_resource
+def build_agents(tool_mode, fast_mode=False):
+    """Create the agent team once per process for each tool mode; fast mode runs every agent on the small model"""
+    tool_set = build_tools()
+    
     # Create specialized agents based on tool mode
     if tool_mode == "exa":
         # Real Exa-powered agents
@@ -380,7 +985,7 @@ if api_key:
             4. Hand off to Analysis Agent when research is complete
             
             Always be thorough and factual in your research.""",
-            tools=[search_information, get_market_data]
+            tools=[tool_set["search_information"], tool_set["get_market_data"]]
         )
         
         exa_agent = Agent(
@@ -393,7 +998,7 @@ if api_key:
             5. Hand off to other agents when web research is complete
             
             Always use real-time web data when available and provide current, accurate information.""",
-            tools=[exa_web_search, exa_company_research]
+            tools=[tool_set["exa_multi_source_research"]]
         )
         
         # Specialized research agents for parallel processing
@@ -406,7 +1011,7 @@ if api_key:
             4. Identify trending research topics and methodologies
             
             Focus on recent, high-quality academic work and emerging research trends.""",
-            tools=[exa_arxiv_search]
+            tools=[tool_set["exa_arxiv_search"]]
         )
         
         twitter_agent = Agent(
@@ -418,7 +1023,7 @@ if api_key:
             4. Track real-time sentiment and public opinion
             
             Focus on current discussions, expert takes, and community insights.""",
-            tools=[exa_twitter_search]
+            tools=[tool_set["exa_twitter_search"]]
         )
         
         paperswithcode_agent = Agent(
@@ -430,7 +1035,7 @@ if api_key:
             4. Track performance improvements and new datasets
             
             Focus on practical, implementable research with code availability.""",
-            tools=[exa_paperswithcode_search]
+            tools=[tool_set["exa_paperswithcode_search"]]
         )
     else:
         # Mock agents for demonstration
@@ -443,7 +1048,7 @@ if api_key:
             4. Hand off to Analysis Agent when research is complete
             
             Note: You are using mock data for demonstration purposes.""",
-            tools=[search_information, get_market_data]
+            tools=[tool_set["search_information"], tool_set["get_market_data"]]
         )
         
         exa_agent = Agent(
@@ -455,7 +1060,7 @@ if api_key:
             4. Use mock data for educational purposes
             
             Note: You are using demonstration data, not real-time information.""",
-            tools=[mock_exa_web_search, mock_exa_company_research]
+            tools=[tool_set["mock_exa_web_search"], tool_set["mock_exa_company_research"]]
         )
         
         # Mock specialized research agents
@@ -467,7 +1072,7 @@ if api_key:
             3. Show how academic research workflows would work
             
             Note: You are using demonstration data, not real arXiv papers.""",
-            tools=[mock_exa_arxiv_search]
+            tools=[tool_set["mock_exa_arxiv_search"]]
         )
         
         twitter_agent = Agent(
@@ -478,7 +1083,7 @@ if api_key:
             3. Show how social media research would work
             
             Note: You are using demonstration data, not real Twitter discussions.""",
-            tools=[mock_exa_twitter_search]
+            tools=[tool_set["mock_exa_twitter_search"]]
         )
         
         paperswithcode_agent = Agent(
@@ -489,7 +1094,7 @@ if api_key:
             3. Show how implementation research would work
             
             Note: You are using demonstration data, not real Papers with Code information.""",
-            tools=[mock_exa_paperswithcode_search]
+            tools=[tool_set["mock_exa_paperswithcode_search"]]
         )
     
     analysis_agent = Agent(
@@ -501,7 +1106,7 @@ if api_key:
         4. Hand off to Writing Agent for final report
         
         Always provide clear, actionable insights.""",
-        tools=[analyze_data]
+        tools=[tool_set["analyze_data"]]
     )
     
     writing_agent = Agent(
@@ -580,44 +1185,109 @@ if api_key:
         handoffs=[research_agent, exa_agent, parallel_research_coordinator, analysis_agent, writing_agent, creative_agent, thinking_agent]
     )
     
-    st.markdown(f"### 👥 Meet Your Agent Team ({tool_mode.upper()} Mode)")
+    agents = {
+        "research_agent": research_agent,
+        "exa_agent": exa_agent,
+        "arxiv_agent": arxiv_agent,
+        "twitter_agent": twitter_agent,
+        "paperswithcode_agent": paperswithcode_agent,
+        "analysis_agent": analysis_agent,
+        "writing_agent": writing_agent,
+        "creative_agent": creative_agent,
+        "thinking_agent": thinking_agent,
+        "parallel_research_coordinator": parallel_research_coordinator,
+        "coordinator_agent": coordinator_agent,
+    }
     
-    if tool_mode == "exa":
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.info("🔍 **Research Specialist**\nGeneral information")
-            st.info("🌐 **Exa Web Analyst**\nReal-time web search")
-            st.info("🧠 **Parallel Coordinator**\nManages parallel research")
-        
-        with col2:
-            st.info("📚 **arXiv Specialist**\nLatest academic papers")
-            st.info("🐦 **Twitter Specialist**\nSocial discussions")
-            st.info("💻 **Papers with Code**\nImplementations & benchmarks")
-        
-        with col3:
-            st.info("🤔 **Strategic Thinking**\nDeep analysis & synthesis")
-            st.info("📊 **Data Analyst**\nInsights from data")
-            st.info("✍️ **Content Writer**\nPolished content")
-        
-        st.success("🤝 **Project Coordinator** - Manages the full team and coordinates handoffs")
+    # Each agent's instructions and tool schemas form a fixed prompt prefix shared by every session;
+    # a stable cache key routes its requests to the same OpenAI prompt-cache shard
+    for key, agent in agents.items():
+        agent.model = _MODEL_BY_ROLE["research" if fast_mode else _AGENT_ROLES.get(key, "research")]
+        agent.model_settings = ModelSettings(extra_body={"prompt_cache_key": f"multi-agent-{tool_mode}-{key}-v1"})
+    
+    return agents
+
+st.markdown("# 🤝 Multi-Agent Orchestration")
+st.markdown(_LOG_CSS, unsafe_allow_html=True)
+st.markdown("---")
+
+st.markdown(_INTRO_MD)
+
+if not AGENTS_AVAILABLE:
+    st.error(_AGENTS_MISSING_MD)
+    st.stop()
+
+# Check for API key from session state
+api_key = st.session_state.get("openai_api_key")
+
+if api_key:
+    # Set the API key for the agents SDK, only touching the environment when it changes
+    if os.environ.get("OPENAI_API_KEY") != api_key:
+        os.environ["OPENAI_API_KEY"] = api_key
+    
+    # Get EXA API key from session state
+    exa_api_key = st.session_state.get("exa_api_key")
+    
+    # Tool selection toggle
+    st.markdown("### 🔧 Tool Configuration")
+    use_exa = st.toggle(
+        "Use Exa AI Tools (Real-time research)", 
+        value=True,  # Default to True for multi-agent since it's more powerful
+        help="Toggle between mock tools and real Exa AI tools for research",
+        disabled=not (EXA_AVAILABLE and exa_api_key)
+    )
+    
+    if use_exa and EXA_AVAILABLE and exa_api_key:
+        if os.environ.get("EXA_API_KEY") != exa_api_key:
+            os.environ["EXA_API_KEY"] = exa_api_key
+        st.success("✅ **Exa Tools Enabled**: Real-time web search, company research, academic papers, and more!")
+        tool_mode = "exa"
     else:
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.info("🔍 **Research Specialist (Mock)**\nSample information")
-            st.info("🌐 **Mock Web Analyst**\nDemo web search")
-            st.info("🧠 **Parallel Coordinator**\nManages demo research")
-        
-        with col2:
-            st.info("📚 **Mock arXiv Specialist**\nSample academic papers")
-            st.info("🐦 **Mock Twitter Specialist**\nDemo social discussions")
-            st.info("💻 **Mock Papers with Code**\nSample implementations")
-        
-        with col3:
-            st.info("🤔 **Strategic Thinking**\nDeep analysis & synthesis")
-            st.info("📊 **Data Analyst**\nInsights from data")
-            st.info("✍️ **Content Writer**\nPolished content")
-        
-        st.warning("🤝 **Project Coordinator** - Using demonstration data for educational purposes")
+        if use_exa and not EXA_AVAILABLE:
+            st.warning("📦 **Install Exa**: Run `pip install exa-py` to enable Exa tools")
+        elif use_exa and not exa_api_key:
+            st.warning("🔑 **EXA API Key Required**: Add your EXA API key in the sidebar")
+        st.info("🔧 **Mock Tools Active**: Using demonstration tools with sample data")
+        tool_mode = "mock"
+    
+    fast_mode = st.toggle(
+        "🏎️ Fast mode",
+        value=False,
+        help=f"Run the Strategic Thinking Analyst on {_MODEL_BY_ROLE['research']} like the other agents, instead of {_MODEL_BY_ROLE['synthesis']}"
+    )
+    
+    # Agents hold no per-session state, so every session shares one team per tool mode and model choice
+    agents = build_agents(tool_mode, fast_mode)
+    coordinator_agent = agents["coordinator_agent"]
+    thinking_agent = agents["thinking_agent"]
+    
+    # Independent research specialists that can run side by side
+    research_specialists = [agents["arxiv_agent"], agents["twitter_agent"], agents["paperswithcode_agent"]]
+    
+    async def fanout(topic, hooks):
+        """Run all research specialists concurrently, cancelling the rest if one fails"""
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tasks = [tg.create_task(Runner.run(agent, topic, hooks=hooks)) for agent in research_specialists]
+        except* Exception as group:
+            # Surface the failing specialist's own error, not the ExceptionGroup wrapping it
+            raise group.exceptions[0]
+        return [task.result() for task in tasks]
+    
+    async def run_streamed(agent, request, hooks, placeholder):
+        """Run an agent while streaming its text into a placeholder, redrawing at most every refresh interval"""
+        streamed = Runner.run_streamed(agent, request, hooks=hooks)
+        text = []
+        last_draw = 0.0
+        async for event in streamed.stream_events():
+            if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+                text.append(event.data.delta)
+                if time.monotonic() - last_draw >= _STREAM_REFRESH_INTERVAL:
+                    placeholder.markdown("".join(text))
+                    last_draw = time.monotonic()
+        return streamed
+    
+    render_agent_team(tool_mode)
     
     # Tool mode explanation
     if tool_mode == "exa":
@@ -628,23 +1298,7 @@ if api_key:
         st.info("📖 **Demo Tools**: Using sample data to demonstrate multi-agent workflows")
     
     with st.expander("🤔 What is Exa AI?"):
-        st.markdown("""
-        **Exa AI** is a next-generation search engine designed for AI applications:
-        
-        🧠 **AI-Native Search**: Unlike Google's keyword matching, Exa understands meaning and context
-        
-        🎯 **Specialized Searches**: 
-        - Company research with business insights
-        - Academic papers from arXiv
-        - Social media discussions from Twitter/X
-        - Code implementations from Papers with Code
-        
-        📊 **Structured Results**: Returns clean, formatted data perfect for AI processing
-        
-        ⚡ **Real-Time**: Get current information, not just training data
-        
-        💡 **Try it yourself**: [Exa Playground](https://dashboard.exa.ai/playground/search)
-        """)
+        st.markdown(_WHAT_IS_EXA_MD)
     
     st.markdown("### 🚀 Try Multi-Agent Collaboration")
     
@@ -662,820 +1316,635 @@ if api_key:
         height=120
     )
     
-    if st.button("🎯 Start Agent Team", type="primary"):
+    parallel_research = st.toggle(
+        "⚡ Parallel research fan-out",
+        value=tool_mode == "exa",
+        help="Run the arXiv, Twitter and Papers with Code specialists concurrently, then synthesize their findings with the Strategic Thinking Analyst"
+    )
+    
+    detailed_log = st.toggle(
+        "🔍 Detailed log on failure",
+        value=False,
+        help="Format each step of a failed run individually instead of showing the raw JSON log"
+    )
+    
+    force_refresh = st.toggle(
+        "♻️ Force refresh",
+        value=False,
+        help="Run the agents again even if this exact request already has a cached result in this session"
+    )
+    
+    # Identical requests in this session reuse the previous result instead of re-invoking the LLM
+    workflow_key = (user_request, tool_mode, fast_mode, parallel_research, hashlib.sha256(api_key.encode()).hexdigest()[:16])
+    workflow_cache = st.session_state.setdefault("multi_agent_workflow_cache", {})
+    
+    run_clicked = st.button("🎯 Start Agent Team", type="primary")
+    if run_clicked and force_refresh:
+        workflow_cache.pop(workflow_key, None)
+    # Reruns triggered from inside the results (e.g. opening a step) replay the cached run
+    replaying = (
+        not run_clicked
+        and st.session_state.get("multi_agent_active_key") == workflow_key
+        and workflow_key in workflow_cache
+    )
+    
+    if run_clicked or replaying:
+        st.session_state["multi_agent_active_key"] = workflow_key
         execution_log = []
-        start_time = datetime.now()
+        start_mono = time.monotonic()
+        
+        # One status component holds the live log, streamed into a single placeholder
+        run_status = st.status("🤝 Agent team is collaborating...", expanded=True)
+        log_slot = run_status.empty()
+        live_log = log_slot.container()
+        # The final agent's answer streams here while it is being written
+        answer_slot = st.empty()
+        
+        def log_step(entry):
+            """Record an execution-log entry and stream it to the live log"""
+            execution_log.append(entry)
+            with live_log:
+                render_log_entry(entry)
         
         try:
+            if run_clicked:
+                st.session_state["multi_agent_celebrated"] = False
+            
             # Initialize execution tracking
-            execution_log.append({
-                "timestamp": start_time,
-                "step": "initialization",
-                "agent": "System",
-                "action": "Starting multi-agent workflow",
-                "status": "in_progress",
-                "details": f"Request: {user_request[:100]}{'...' if len(user_request) > 100 else ''}",
-                "error": None
-            })
+            log_step(LogEntry(
+                t=0.0,
+                step="initialization",
+                agent="System",
+                action="Starting multi-agent workflow",
+                status="in_progress",
+                details=f"Request: {truncate(user_request, 100)}",
+                error=None
+            ))
+            
+            def log_event(event):
+                """Log one SDK hook event taken off the event queue"""
+                stamp, agent_name, action = event
+                log_step(LogEntry(
+                    t=stamp - start_mono,
+                    step="event",
+                    agent=agent_name,
+                    action=action,
+                    status="in_progress"
+                ))
             
-            with st.spinner("🤝 Agent team is collaborating..."):
-                # Handle asyncio event loop for Streamlit
-                def run_agent_workflow():
-                    """Run the agent workflow in a separate thread with its own event loop"""
-                    workflow_log = []
+            async def drain_events(events):
+                """Consume hook events as the agents produce them"""
+                while True:
+                    log_event(await events.get())
+            
+            async def run_agent_workflow():
+                """Run the agent workflow on the current asyncio event loop"""
+                # Hooks only enqueue; a separate task renders, so SDK callbacks never wait on the UI
+                events = asyncio.Queue(maxsize=_LOG_QUEUE_SIZE)
+                usage_hooks = AgentUsageHooks(events)
+                drainer = asyncio.create_task(drain_events(events))
+                try:
+                    log_step(LogEntry(
+                        t=time.monotonic() - start_mono,
+                        step="setup",
+                        agent="System",
+                        action="Started asyncio event loop",
+                        status="success",
+                        details="Event loop initialized for multi-agent execution",
+                        error=None
+                    ))
                     
-                    try:
-                        # Create a new event loop for this thread
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                        
-                        workflow_log.append({
-                            "timestamp": datetime.now(),
-                            "step": "setup",
-                            "agent": "System",
-                            "action": "Created new event loop",
-                            "status": "success",
-                            "details": "Event loop initialized for multi-agent execution",
-                            "error": None
-                        })
-                        
-                        # Run the agent workflow
-                        workflow_log.append({
-                            "timestamp": datetime.now(),
-                            "step": "execution",
-                            "agent": "Project Coordinator",
-                            "action": "Starting agent collaboration",
-                            "status": "in_progress",
-                            "details": "Coordinator analyzing request and delegating to appropriate agents",
-                            "tools_used": [],
-                            "cost": "Not available",
-                            "raw_output": None,
-                            "error": None
-                        })
+                    if parallel_research:
+                        log_step(LogEntry(
+                            t=time.monotonic() - start_mono,
+                            step="execution",
+                            agent="Parallel Research Coordinator",
+                            action="Fanning out to research specialists",
+                            status="in_progress",
+                            details=f"Running {len(research_specialists)} specialists concurrently",
+                            tools_used=(),
+                            cost="Not available",
+                            raw_output=None,
+                            error=None
+                        ))
                         
-                        result = Runner.run_sync(coordinator_agent, user_request)
+                        research_results = await fanout(user_request, usage_hooks)
                         
-                        workflow_log.append({
-                            "timestamp": datetime.now(),
-                            "step": "completion",
-                            "agent": "System",
-                            "action": "Workflow completed successfully",
-                            "status": "success",
-                            "details": f"Final output length: {len(result.final_output)} characters",
-                            "tools_used": ["Multi-agent coordination"],
-                            "cost": calculate_agent_cost(len(getattr(result, 'messages', [])), 200),
-                            "raw_output": result.final_output[:500] + "..." if len(result.final_output) > 500 else result.final_output,
-                            "error": None
-                        })
+                        for specialist, research in zip(research_specialists, research_results):
+                            log_step(LogEntry(
+                                t=time.monotonic() - start_mono,
+                                step="research",
+                                agent=specialist.name,
+                                action="Research completed",
+                                status="success",
+                                details=f"Output length: {len(research.final_output)} characters",
+                                tools_used=tuple(tool.name for tool in specialist.tools),
+                                **calculate_agent_cost(len(getattr(research, 'messages', [])), 200),
+                                raw_output=truncate(research.final_output, 500),
+                                error=None
+                            ))
                         
-                        return result, workflow_log
+                        # Synthesize the combined findings in a single follow-up run
+                        combined = "\n\n".join(
+                            f"## {specialist.name}\n{research.final_output}"
+                            for specialist, research in zip(research_specialists, research_results)
+                        )
+                        result = await run_streamed(
+                            thinking_agent,
+                            f"{user_request}\n\nResearch findings:\n\n{combined}",
+                            usage_hooks,
+                            answer_slot
+                        )
+                        usage = summarize_usage(*research_results, result)
+                    else:
+                        # Run the agent workflow
+                        log_step(LogEntry(
+                            t=time.monotonic() - start_mono,
+                            step="execution",
+                            agent="Project Coordinator",
+                            action="Starting agent collaboration",
+                            status="in_progress",
+                            details="Coordinator analyzing request and delegating to appropriate agents",
+                            tools_used=(),
+                            cost="Not available",
+                            raw_output=None,
+                            error=None
+                        ))
                         
-                    except Exception as e:
-                        workflow_log.append({
-                            "timestamp": datetime.now(),
-                            "step": "error",
-                            "agent": "System",
-                            "action": "Workflow failed",
-                            "status": "error",
-                            "details": f"Error type: {type(e).__name__}",
-                            "error": str(e)
-                        })
-                        raise e
-                    finally:
-                        loop.close()
-                
-                # Run in a separate thread to avoid event loop conflicts
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(run_agent_workflow)
-                    result, workflow_log = future.result(timeout=60)  # 60 second timeout
-                    execution_log.extend(workflow_log)
+                        result = await run_streamed(coordinator_agent, user_request, usage_hooks, answer_slot)
+                        usage = summarize_usage(result)
+                    
+                    log_step(LogEntry(
+                        t=time.monotonic() - start_mono,
+                        step="completion",
+                        agent="System",
+                        action="Workflow completed successfully",
+                        status="success",
+                        details=f"Final output length: {len(result.final_output)} characters",
+                        tools_used=("Multi-agent coordination",),
+                        **calculate_agent_cost(len(getattr(result, 'messages', [])), 200),
+                        raw_output=truncate(result.final_output, 500),
+                        error=None
+                    ))
+                    
+                    return result, usage, {
+                        name: {**totals, "model": usage_hooks.models[name]}
+                        for name, totals in usage_hooks.by_agent.items()
+                    }
+                    
+                except Exception as e:
+                    log_step(LogEntry(
+                        t=time.monotonic() - start_mono,
+                        step="error",
+                        agent="System",
+                        action="Workflow failed",
+                        status="error",
+                        details=f"Error type: {type(e).__name__}",
+                        error=str(e)
+                    ))
+                    raise e
+                finally:
+                    drainer.cancel()
+                    while not events.empty():
+                        log_event(events.get_nowait())
+            
+            if workflow_key in workflow_cache:
+                result, cached_log, usage, agent_usage = workflow_cache[workflow_key]
+                execution_log.extend(cached_log)
+                log_step(LogEntry(
+                    t=time.monotonic() - start_mono,
+                    step="cache",
+                    agent="System",
+                    action="Reused cached workflow result",
+                    status="success",
+                    details=f"This exact request already ran in this session; saved {usage.get('requests', 0)} API calls",
+                    error=None
+                ))
+            else:
+                # Await the workflow directly; the timeout uses the event loop's own timer
+                result, usage, agent_usage = asyncio.run(asyncio.wait_for(run_agent_workflow(), timeout=60))  # 60 second timeout
+                # Bounded per session: keep the newest runs, only the tail of each log, and the token usage
+                workflow_cache[workflow_key] = (result, execution_log[1:][-_LOG_CAPACITY:], usage, agent_usage)
+                while len(workflow_cache) > _WORKFLOW_CACHE_SIZE:
+                    workflow_cache.pop(next(iter(workflow_cache)))
+            
+            # Final success log
+            log_step(LogEntry(
+                t=time.monotonic() - start_mono,
+                step="final",
+                agent="System",
+                action="Multi-agent workflow completed",
+                status="success",
+                details=f"Total execution time: {time.monotonic() - start_mono:.2f}s",
+                error=None
+            ))
+            
+            # The detailed steps below supersede the live log
+            run_status.update(label="✅ Agent team finished", state="complete", expanded=False)
+            
+            # Display results; the final answer replaces its streamed draft
+            answer_slot.empty()
+            st.markdown("### 🎉 Team Results")
+            st.success(result.final_output)
+            
+            # Display detailed execution log with ReAct-style breakdown
+            st.markdown("### 📋 Multi-Agent Execution Steps")
+            
+            # Only one page of steps is rendered per rerun; the page lives in session state
+            display_log, first_step = paginate(execution_log, _LOG_DISPLAY_LIMIT, "multi_log_page")
+            # Agents run on different models by role; show the one the SDK reported for each
+            agent_models = {name: totals["model"] for name, totals in agent_usage.items()}
+            
+            if len(display_log) > _LOG_TABLE_THRESHOLD:
+                # Long logs go in a virtualized table; selecting a row renders that one step's full details
+                selection = st.dataframe(
+                    [
+                        {
+                            "Step": i + 1,
+                            "Status": f"{log_entry.icon} {log_entry.status}",
+                            "Agent": log_entry.agent,
+                            "Action": log_entry.action,
+                            "Tools": ", ".join(log_entry.tools_used),
+                            "Elapsed": log_entry.elapsed,
+                        }
+                        for i, log_entry in enumerate(display_log, start=first_step)
+                    ],
+                    hide_index=True,
+                    use_container_width=True,
+                    on_select="rerun",
+                    selection_mode="single-row",
+                    key=f"multi_step_table_{first_step}"
+                )
+                for row in selection.selection.rows:
+                    render_step_details(display_log[row], agent_models)
+            else:
+                for i, log_entry in enumerate(display_log, start=first_step):
+                    # Create expandable section for each step (similar to ReAct)
+                    step_title = f"Step {i+1}: {log_entry.step.upper()}" if log_entry.step else f"Step {i+1}: {log_entry.action}"
+                    tools_info = f" | Tools: {', '.join(log_entry.tools_used)}" if log_entry.tools_used else ""
                 
-                # Final success log
-                execution_log.append({
-                    "timestamp": datetime.now(),
-                    "step": "final",
-                    "agent": "System",
-                    "action": "Multi-agent workflow completed",
-                    "status": "success",
-                    "details": f"Total execution time: {datetime.now() - start_time}",
-                    "error": None
-                })
+                    step_label = f"{log_entry.icon} {step_title} - {log_entry.agent}{tools_info}"
+                    if _LAZY_EXPANDERS:
+                        # Only build the body once the user opens this step
+                        step_expander = st.expander(step_label, expanded=False, key=f"multi_step_{i}", on_change="rerun")
+                        if not step_expander.open:
+                            continue
+                    else:
+                        step_expander = st.expander(step_label, expanded=False)
                 
-                # Display results
-                st.markdown("### 🎉 Team Results")
-                st.success(result.final_output)
+                    with step_expander:
+                        render_step_details(log_entry, agent_models)
+            
+            # Show the agent workflow messages with detailed breakdown (like ReAct)
+            st.markdown("### 👥 Agent Collaboration Flow")
+            
+            # The run's items: message outputs and tool calls, each tagged with the agent that produced it
+            # (for parallel research this is the synthesis run; the specialists appear in the steps above)
+            agent_steps = []
+            tool_usage_map = {}
+            for i, item in enumerate(result.new_items):
+                if item.type not in ("message_output_item", "tool_call_item"):
+                    continue
+                agent_name = item.agent.name
+                if item.type == "tool_call_item":
+                    tool = getattr(item.raw_item, "name", None) or item.raw_item.type
+                    tool_usage_map.setdefault(agent_name, set()).add(tool)
+                    # Tool calls the agent makes back to back form one step
+                    last = agent_steps[-1] if agent_steps else None
+                    if last and last["agent_name"] == agent_name and not last["content"]:
+                        last["tools_used"].append(tool)
+                        continue
+                    content, tools_used = "", [tool]
+                else:
+                    content, tools_used = ItemHelpers.text_message_output(item), []
                 
-                # Display detailed execution log with ReAct-style breakdown
-                st.markdown("### 📋 Multi-Agent Execution Steps")
+                agent_steps.append({
+                    "step_number": len(agent_steps) + 1,
+                    "agent_name": agent_name,
+                    "model": agent_models.get(agent_name) or item.agent.model,
+                    "content": content,
+                    "item_index": i,
+                    "tools_used": tools_used
+                })
+            
+            if agent_steps:
+                # Show overall collaboration summary first
+                st.markdown("**🔄 Collaboration Summary:**")
+                total_tool_calls = sum(len(step['tools_used']) for step in agent_steps)
+                cols = st.columns(3)
+                cols[0].metric("Total Agent Steps", len(agent_steps))
+                cols[1].metric("Agents Involved", len(set(step['agent_name'] for step in agent_steps)))
+                cols[2].metric("Total Tool Calls", total_tool_calls)
                 
-                for i, log_entry in enumerate(execution_log):
-                    # Determine status icon and color
-                    if log_entry["status"] == "success":
-                        status_icon = "✅"
-                        status_color = "green"
-                    elif log_entry["status"] == "error":
-                        status_icon = "❌"
-                        status_color = "red"
-                    elif log_entry["status"] == "in_progress":
-                        status_icon = "🔄"
-                        status_color = "blue"
+                # Show detailed agent steps (similar to ReAct format)
+                flow_steps, _ = paginate(agent_steps, _FLOW_PAGE_SIZE, "multi_flow_page")
+                for step in flow_steps:
+                    # Determine step status
+                    if step.get("tools_used"):
+                        status_icon = "🔧"
+                        step_type = "TOOL USAGE"
+                    elif step.get("content"):
+                        status_icon = "💭"
+                        step_type = "THINKING"
                     else:
                         status_icon = "ℹ️"
-                        status_color = "gray"
-                    
-                    # Create expandable section for each step (similar to ReAct)
-                    timestamp_str = log_entry["timestamp"].strftime("%H:%M:%S.%f")[:-3]
-                    step_title = f"Step {i+1}: {log_entry['step'].upper()}" if log_entry.get('step') else f"Step {i+1}: {log_entry['action']}"
-                    tools_info = f" | Tools: {', '.join(log_entry.get('tools_used', []))}" if log_entry.get('tools_used') else ""
+                        step_type = "INFO"
                     
-                    with st.expander(f"{status_icon} {step_title} - {log_entry['agent']}{tools_info}", expanded=False):
+                    with st.expander(f"{status_icon} Agent Step {step['step_number']}: {step_type} - {step['agent_name']}", expanded=False):
                         
                         # Show step metadata (similar to ReAct)
                         col1, col2 = st.columns(2)
                         with col1:
-                            st.markdown(f"**Agent:** {log_entry['agent']}")
-                            st.markdown(f"**Model:** gpt-4o-mini")  # Multi-agent uses this model
+                            st.markdown(f"**Agent:** {step['agent_name']}")
+                            st.markdown(f"**Model:** {step['model']}")
                         with col2:
-                            st.markdown(f"**API Cost:** {log_entry.get('cost', 'Not available')}")
-                            st.markdown(f"**Timestamp:** {timestamp_str}")
+                            st.markdown("**API Cost:** Not available")
+                            st.markdown(f"**Item Index:** {step['item_index']}")
                         
-                        # Show agent's action/thinking
-                        if log_entry.get("action"):
-                            st.markdown("**🤖 Agent Action:**")
-                            st.info(log_entry["action"])
+                        # Show agent's thinking/reasoning
+                        if step.get("content"):
+                            st.markdown("**🤖 Agent's Response:**")
+                            st.info(step["content"])
                         
                         # Show tools used (similar to ReAct tool calls)
-                        if log_entry.get("tools_used"):
+                        if step.get("tools_used"):
                             st.markdown("**🔧 Tools Used:**")
-                            for j, tool in enumerate(log_entry["tools_used"]):
+                            for j, tool in enumerate(step["tools_used"]):
                                 st.markdown(f"**Tool {j+1}: `{tool}`** | Cost: Not available")
-                                
-                                # Show tool result
-                                if log_entry.get("raw_output"):
-                                    st.success(f"✅ Tool Result: {tool} executed successfully")
+                                st.success(f"✅ Tool Result: {tool} executed by {step['agent_name']}")
                         
-                        # Show step details
-                        if log_entry.get("details"):
-                            st.markdown("**📋 Step Details:**")
-                            st.info(log_entry["details"])
+                        # Show available tools for this agent type
+                        st.markdown("**🛠️ Agent's Available Tools:**")
+                        st.info(_AGENT_TOOL_HINTS(step['agent_name']))
                         
-                        # Show raw output in expandable section (like ReAct)
-                        if log_entry.get("raw_output"):
-                            with st.expander(f"🔍 Raw Output from {log_entry['agent']}", expanded=False):
-                                st.code(log_entry["raw_output"], language="text")
+                        # Show raw output (expanders cannot nest, so it sits inline)
+                        if step.get("content"):
+                            st.markdown(f"**🔍 Raw Output from {step['agent_name']}:**")
+                            st.code(step["content"], language="text")
                         
-                        # Show step error
-                        if log_entry.get("error"):
-                            st.error(f"❌ Step Error: {log_entry['error']}")
-                            
-                            # Provide specific error guidance (like ReAct)
-                            if "api" in log_entry["error"].lower() or "key" in log_entry["error"].lower():
-                                st.info("💡 **API Key Issue**: Check that your OpenAI API key is valid and has sufficient credits.")
-                            elif "timeout" in log_entry["error"].lower():
-                                st.info("💡 **Timeout Issue**: The request may be too complex. Try a simpler request.")
-                            elif "event loop" in log_entry["error"].lower():
-                                st.info("💡 **Event Loop Issue**: Try refreshing the page and running again.")
-                            else:
-                                st.info("💡 **General Error**: Try refreshing the page. If the issue persists, check your API keys.")
+                        # Show handoff information if this is a coordinator
+                        if "Coordinator" in step['agent_name']:
+                            st.markdown("**🔄 Possible Handoffs:**")
+                            st.info("This agent can delegate tasks to specialized agents based on the request type")
                 
-                # Show the agent workflow messages with detailed breakdown (like ReAct)
-                st.markdown("### 👥 Agent Collaboration Flow")
+                # Show tool usage summary per agent
+                if tool_usage_map:
+                    st.markdown("### 🔧 Tool Usage by Agent")
+                    for agent_name, tools in tool_usage_map.items():
+                        if tools:
+                            with st.expander(f"🤖 {agent_name} - Used {len(tools)} tool(s)", expanded=False):
+                                for tool in sorted(tools):
+                                    st.success(f"✅ {tool}")
+            else:
+                st.info("No detailed agent messages available, but workflow completed successfully!")
+            
+            # Show execution summary (enhanced like ReAct)
+            st.markdown("### 📊 Multi-Agent Execution Summary")
+            total_time = time.monotonic() - start_mono
+            
+            # One pass over the log gathers every summary figure and the per-agent stats below
+            status_counts = Counter()
+            agent_stats = {}
+            total_tools = 0
+            step_count = 0
+            api_calls = 0
+            total_cost = 0.0
+            for log in execution_log:
+                # Hook events annotate steps (and interleave across concurrent specialists); they are not steps
+                if log.step == "event":
+                    continue
+                step_count += 1
+                status_counts[log.status] += 1
+                total_tools += len(log.tools_used)
+                if log.cost_usd is not None:
+                    total_cost += log.cost_usd
+                    api_calls += 1
+                if log.agent == "System":
+                    continue
                 
-                if hasattr(result, 'messages') and result.messages:
-                    agent_steps = []
-                    tool_usage_map = {}
-                    
-                    # Process messages to extract agent interactions and tool usage
-                    for i, message in enumerate(result.messages):
-                        if hasattr(message, 'role') and message.role == 'assistant':
-                            agent_name = getattr(message, 'name', 'Unknown Agent')
-                            content = getattr(message, 'content', '')
-                            
-                            # Check for tool calls in the message
-                            tool_calls = getattr(message, 'tool_calls', [])
-                            tools_used = []
-                            if tool_calls:
-                                for tool_call in tool_calls:
-                                    if hasattr(tool_call, 'function'):
-                                        tools_used.append(tool_call.function.name)
-                            
-                            if content or tools_used:
-                                agent_steps.append({
-                                    "step_number": len(agent_steps) + 1,
-                                    "agent_name": agent_name,
-                                    "content": content,
-                                    "message_index": i,
-                                    "tools_used": tools_used,
-                                    "has_tool_calls": len(tools_used) > 0
-                                })
-                                
-                                # Track tool usage per agent
-                                if agent_name not in tool_usage_map:
-                                    tool_usage_map[agent_name] = set()
-                                tool_usage_map[agent_name].update(tools_used)
+                stats = agent_stats.setdefault(log.agent, Counter())
+                stats["steps"] += 1
+                stats["tools"] += len(log.tools_used)
+                stats[log.status] += 1
+                stats["cost"] += log.cost_usd or 0.0
+            
+            success_count = status_counts["success"]
+            error_count = status_counts["error"]
+            agents_used = agent_stats.keys()
+            # Handoffs as the SDK reported them; specialists running side by side never hand off
+            handoffs = sum(totals.get("handoffs", 0) for totals in agent_usage.values()) if agent_usage else 0
+            
+            # Main metrics
+            cols = st.columns(4)
+            cols[0].metric("Total Time", f"{total_time:.2f}s")
+            cols[1].metric("Total Steps", step_count)
+            cols[2].metric("Successful Steps", success_count)
+            cols[3].metric("Errors", error_count)
+            
+            # Agent-specific metrics
+            st.markdown("### 🤖 Agent Activity Summary")
+            cols = st.columns(3)
+            cols[0].metric("Unique Agents", len(agents_used))
+            cols[1].metric("Total Tool Calls", total_tools)
+            cols[2].metric("Agent Handoffs", handoffs)
+            
+            # Cost analysis (enhanced like ReAct)
+            st.markdown("### 💰 Cost Analysis")
+            
+            cols = st.columns(4)
+            cols[0].metric("API Calls", api_calls)
+            cols[1].metric("Tool Executions", total_tools)
+            cols[2].metric(
+                "Reported Tokens",
+                f"{usage['input_tokens'] + usage['output_tokens']:,}" if usage else "Not available",
+                help="Input + output tokens reported by the Agents SDK for this run"
+            )
+            cols[3].metric("Estimated Total Cost", f"${total_cost:.6f}" if api_calls else "Not available")
+            
+            if agent_usage:
+                with st.expander("🧮 Token usage by agent (reported by the Agents SDK)"):
+                    usage_rows = [
+                        {
+                            "Agent": name,
+                            "Model": totals.get("model"),
+                            "LLM Calls": totals.get("requests", 0),
+                            "Input Tokens": totals.get("input_tokens", 0),
+                            "Output Tokens": totals.get("output_tokens", 0),
+                            "Tool Calls": totals.get("tool_calls", 0),
+                            "Handoffs": totals.get("handoffs", 0),
+                            "Cost ($)": round(
+                                usage_cost(totals.get("input_tokens", 0), totals.get("output_tokens", 0), totals.get("model")),
+                                6
+                            ),
+                        }
+                        for name, totals in agent_usage.items()
+                    ]
+                    usage_rows.sort(key=lambda row: row["Input Tokens"] + row["Output Tokens"], reverse=True)
+                    st.dataframe(usage_rows, hide_index=True, use_container_width=True)
+            
+            # Show detailed agent breakdown
+            if agents_used:
+                st.markdown("### 🎯 Agent Performance Breakdown")
+                
+                # Display agent stats in expandable sections
+                for agent_name, stats in agent_stats.items():
+                    success_rate = (stats["success"] / stats["steps"] * 100) if stats["steps"] > 0 else 0
                     
-                    if agent_steps:
-                        # Show overall collaboration summary first
-                        st.markdown("**🔄 Collaboration Summary:**")
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            st.metric("Total Agent Steps", len(agent_steps))
-                        with col2:
-                            st.metric("Agents Involved", len(set(step['agent_name'] for step in agent_steps)))
-                        with col3:
-                            total_tool_calls = sum(len(step['tools_used']) for step in agent_steps)
-                            st.metric("Total Tool Calls", total_tool_calls)
+                    with st.expander(f"🤖 {agent_name} - {stats['steps']} steps, {success_rate:.1f}% success", expanded=False):
+                        cols = st.columns(4)
+                        cols[0].metric("Steps", stats["steps"])
+                        cols[1].metric("Tools Used", stats["tools"])
+                        cols[2].metric("Success Rate", f"{success_rate:.1f}%")
+                        cols[3].metric("Cost", f"${stats['cost']:.6f}" if stats["cost"] > 0 else "Not available")
                         
-                        # Show detailed agent steps (similar to ReAct format)
-                        for step in agent_steps:
-                            # Determine step status
-                            if step.get("has_tool_calls"):
-                                status_icon = "🔧"
-                                step_type = "TOOL USAGE"
-                            elif step.get("content"):
-                                status_icon = "💭"
-                                step_type = "THINKING"
-                            else:
-                                status_icon = "ℹ️"
-                                step_type = "INFO"
-                            
-                            with st.expander(f"{status_icon} Agent Step {step['step_number']}: {step_type} - {step['agent_name']}", expanded=False):
-                                
-                                # Show step metadata (similar to ReAct)
-                                col1, col2 = st.columns(2)
-                                with col1:
-                                    st.markdown(f"**Agent:** {step['agent_name']}")
-                                    st.markdown(f"**Model:** gpt-4o-mini")
-                                with col2:
-                                    st.markdown(f"**API Cost:** Not available")
-                                    st.markdown(f"**Message Index:** {step['message_index']}")
-                                
-                                # Show agent's thinking/reasoning
-                                if step.get("content"):
-                                    st.markdown("**🤖 Agent's Response:**")
-                                    st.info(step["content"])
-                                
-                                # Show tools used (similar to ReAct tool calls)
-                                if step.get("tools_used"):
-                                    st.markdown("**🔧 Tools Used:**")
-                                    for j, tool in enumerate(step["tools_used"]):
-                                        st.markdown(f"**Tool {j+1}: `{tool}`** | Cost: Not available")
-                                        st.success(f"✅ Tool Result: {tool} executed by {step['agent_name']}")
-                                
-                                # Show available tools for this agent type
-                                st.markdown("**🛠️ Agent's Available Tools:**")
-                                if "Exa" in step['agent_name'] or "Web" in step['agent_name']:
-                                    st.info("🌐 Web search, Company research, arXiv papers, Twitter, Papers with Code")
-                                elif "Research" in step['agent_name'] and "Specialist" in step['agent_name']:
-                                    st.info("🔍 Information search, Market data")
-                                elif "arXiv" in step['agent_name']:
-                                    st.info("📚 arXiv paper search, Academic research")
-                                elif "Twitter" in step['agent_name']:
-                                    st.info("🐦 Twitter search, Social media analysis")
-                                elif "Papers with Code" in step['agent_name']:
-                                    st.info("💻 Code implementations, Benchmarks")
-                                elif "Analysis" in step['agent_name'] or "Analyst" in step['agent_name']:
-                                    st.info("📊 Data analysis, Pattern recognition, Strategic thinking")
-                                elif "Coordinator" in step['agent_name']:
-                                    st.info("🤝 Agent handoffs, Task delegation, Workflow management")
-                                elif "Writer" in step['agent_name'] or "Writing" in step['agent_name']:
-                                    st.info("✍️ Content creation, Report writing")
-                                else:
-                                    st.info("📝 Content generation, Creative enhancement")
-                                
-                                # Show raw output in expandable section (like ReAct)
-                                if step.get("content"):
-                                    with st.expander(f"🔍 Raw Output from {step['agent_name']}", expanded=False):
-                                        st.code(step["content"], language="text")
-                                
-                                # Show handoff information if this is a coordinator
-                                if "Coordinator" in step['agent_name']:
-                                    st.markdown("**🔄 Possible Handoffs:**")
-                                    st.info("This agent can delegate tasks to specialized agents based on the request type")
-                        
-                        # Show tool usage summary per agent
-                        if tool_usage_map:
-                            st.markdown("### 🔧 Tool Usage by Agent")
-                            for agent_name, tools in tool_usage_map.items():
-                                if tools:
-                                    with st.expander(f"🤖 {agent_name} - Used {len(tools)} tool(s)", expanded=False):
-                                        for tool in sorted(tools):
-                                            st.success(f"✅ {tool}")
-                    else:
-                        st.info("No detailed agent messages available, but workflow completed successfully!")
-                else:
-                    st.info("Agent workflow completed successfully!")
-                
-                # Show execution summary (enhanced like ReAct)
-                st.markdown("### 📊 Multi-Agent Execution Summary")
-                total_time = datetime.now() - start_time
-                success_count = sum(1 for log in execution_log if log["status"] == "success")
-                error_count = sum(1 for log in execution_log if log["status"] == "error")
-                in_progress_count = sum(1 for log in execution_log if log["status"] == "in_progress")
-                
-                # Main metrics
-                col1, col2, col3, col4 = st.columns(4)
-                with col1:
-                    st.metric("Total Time", f"{total_time.total_seconds():.2f}s")
-                with col2:
-                    st.metric("Total Steps", len(execution_log))
-                with col3:
-                    st.metric("Successful Steps", success_count)
-                with col4:
-                    st.metric("Errors", error_count)
-                
-                # Agent-specific metrics
-                agents_used = set(log["agent"] for log in execution_log if log["agent"] != "System")
-                total_tools = sum(len(log.get("tools_used", [])) for log in execution_log)
+                        # Show agent role
+                        st.info(_AGENT_ROLE_HINTS(agent_name))
+            
+            # Final status indicator (like ReAct)
+            st.markdown("### 🎯 Task Completion Status")
+            if error_count == 0:
+                st.success("🎉 **Multi-Agent Workflow Completed Successfully!**")
+                if success_count > 0:
+                    st.info(f"✅ All {success_count} steps completed without errors")
+                # Celebrate once per run, not on every replay triggered by widget interaction
+                if execution_log and not st.session_state.get("multi_agent_celebrated"):
+                    st.balloons()
+                    st.session_state["multi_agent_celebrated"] = True
+            elif success_count > error_count:
+                st.warning(f"⚠️ **Workflow Completed with {error_count} Error(s)**")
+                st.info(f"✅ {success_count} successful steps, ❌ {error_count} failed steps")
+            else:
+                st.error("❌ **Workflow Failed**")
+                st.info(f"Multiple errors occurred during execution ({error_count} errors, {success_count} successes)")
+            
+            # Show workflow insights (like ReAct's final insights)
+            st.markdown("### 💡 Workflow Insights")
+            
+            # Calculate some insights
+            if agents_used:
+                most_active_agent = max(agent_stats.items(), key=lambda x: x[1]["steps"])[0]
+                total_agent_steps = sum(stats["steps"] for stats in agent_stats.values())
                 
-                st.markdown("### 🤖 Agent Activity Summary")
-                col1, col2, col3 = st.columns(3)
+                col1, col2 = st.columns(2)
                 with col1:
-                    st.metric("Unique Agents", len(agents_used))
-                with col2:
-                    st.metric("Total Tool Calls", total_tools)
-                with col3:
-                    # Calculate agent handoffs (transitions between different agents)
-                    handoffs = 0
-                    prev_agent = None
-                    for log in execution_log:
-                        if log["agent"] != "System" and prev_agent and log["agent"] != prev_agent:
-                            handoffs += 1
-                        if log["agent"] != "System":
-                            prev_agent = log["agent"]
-                    st.metric("Agent Handoffs", handoffs)
-                
-                # Cost analysis (enhanced like ReAct)
-                st.markdown("### 💰 Cost Analysis")
-                col1, col2, col3 = st.columns(3)
-                
-                # Calculate total cost
-                total_cost = 0
-                cost_available = False
-                api_calls = 0
-                
-                for log in execution_log:
-                    if log.get("cost") and "$" in str(log["cost"]):
-                        try:
-                            cost_str = log["cost"].split("$")[1].split(" ")[0]
-                            total_cost += float(cost_str)
-                            cost_available = True
-                            api_calls += 1
-                        except:
-                            pass
+                    st.markdown("**🏆 Most Active Agent:**")
+                    st.info(f"{most_active_agent}")
+                    
+                    st.markdown("**⚡ Execution Efficiency:**")
+                    if total_time > 0:
+                        steps_per_second = step_count / total_time
+                        st.info(f"{steps_per_second:.2f} steps/second")
+                    else:
+                        st.info("Instant execution")
                 
-                with col1:
-                    st.metric("API Calls", api_calls)
                 with col2:
-                    st.metric("Tool Executions", total_tools)
-                with col3:
-                    if cost_available:
-                        st.metric("Estimated Total Cost", f"${total_cost:.6f}")
+                    st.markdown("**🔧 Tool Usage:**")
+                    if total_tools > 0:
+                        st.info(f"{total_tools} tools executed across {len(agents_used)} agents")
                     else:
-                        st.metric("Estimated Total Cost", "Not available")
-                
-                # Show detailed agent breakdown
-                if agents_used:
-                    st.markdown("### 🎯 Agent Performance Breakdown")
-                    
-                    agent_stats = {}
-                    for log in execution_log:
-                        agent = log["agent"]
-                        if agent != "System":
-                            if agent not in agent_stats:
-                                agent_stats[agent] = {
-                                    "steps": 0,
-                                    "tools": 0,
-                                    "success": 0,
-                                    "errors": 0,
-                                    "cost": 0
-                                }
-                            
-                            agent_stats[agent]["steps"] += 1
-                            agent_stats[agent]["tools"] += len(log.get("tools_used", []))
-                            
-                            if log["status"] == "success":
-                                agent_stats[agent]["success"] += 1
-                            elif log["status"] == "error":
-                                agent_stats[agent]["errors"] += 1
-                            
-                            # Try to add cost
-                            if log.get("cost") and "$" in str(log["cost"]):
-                                try:
-                                    cost_str = log["cost"].split("$")[1].split(" ")[0]
-                                    agent_stats[agent]["cost"] += float(cost_str)
-                                except:
-                                    pass
+                        st.info("No external tools used")
                     
-                    # Display agent stats in expandable sections
-                    for agent_name, stats in agent_stats.items():
-                        success_rate = (stats["success"] / stats["steps"] * 100) if stats["steps"] > 0 else 0
-                        
-                        with st.expander(f"🤖 {agent_name} - {stats['steps']} steps, {success_rate:.1f}% success", expanded=False):
-                            col1, col2, col3, col4 = st.columns(4)
-                            with col1:
-                                st.metric("Steps", stats["steps"])
-                            with col2:
-                                st.metric("Tools Used", stats["tools"])
-                            with col3:
-                                st.metric("Success Rate", f"{success_rate:.1f}%")
-                            with col4:
-                                if stats["cost"] > 0:
-                                    st.metric("Cost", f"${stats['cost']:.6f}")
-                                else:
-                                    st.metric("Cost", "Not available")
-                            
-                            # Show agent role
-                            if "Coordinator" in agent_name:
-                                st.info("🎯 **Role**: Manages workflow and delegates to specialized agents")
-                            elif "Exa" in agent_name or "Web" in agent_name:
-                                st.info("🌐 **Role**: Real-time web search and current information")
-                            elif "Research" in agent_name:
-                                st.info("🔍 **Role**: Information gathering and research")
-                            elif "Analysis" in agent_name or "Analyst" in agent_name:
-                                st.info("📊 **Role**: Data analysis and strategic insights")
-                            elif "Writer" in agent_name or "Writing" in agent_name:
-                                st.info("✍️ **Role**: Content creation and report writing")
-                            else:
-                                st.info("🤖 **Role**: Specialized task execution")
+                    st.markdown("**🤝 Collaboration:**")
+                    if handoffs > 0:
+                        st.info(f"{handoffs} handoffs between agents")
+                    else:
+                        st.info("Single agent execution")
+            
+            # Show recommendations for improvement (like ReAct)
+            if error_count > 0:
+                st.markdown("### 🔧 Recommendations for Next Run")
+                recommendations = []
                 
-                # Final status indicator (like ReAct)
-                st.markdown("### 🎯 Task Completion Status")
-                if error_count == 0:
-                    st.success("🎉 **Multi-Agent Workflow Completed Successfully!**")
-                    if success_count > 0:
-                        st.info(f"✅ All {success_count} steps completed without errors")
-                    st.balloons()
-                elif success_count > error_count:
-                    st.warning(f"⚠️ **Workflow Completed with {error_count} Error(s)**")
-                    st.info(f"✅ {success_count} successful steps, ❌ {error_count} failed steps")
-                else:
-                    st.error("❌ **Workflow Failed**")
-                    st.info(f"Multiple errors occurred during execution ({error_count} errors, {success_count} successes)")
+                if "api" in str([log.error or "" for log in execution_log]).lower():
+                    recommendations.append("🔑 **API Keys**: Verify all API keys are valid and have sufficient credits")
                 
-                # Show workflow insights (like ReAct's final insights)
-                st.markdown("### 💡 Workflow Insights")
+                if "timeout" in str([log.error or "" for log in execution_log]).lower():
+                    recommendations.append("⏱️ **Complexity**: Try breaking down the request into smaller, more specific tasks")
                 
-                # Calculate some insights
-                if agents_used:
-                    most_active_agent = max(agent_stats.items(), key=lambda x: x[1]["steps"])[0] if 'agent_stats' in locals() else "Unknown"
-                    total_agent_steps = sum(stats["steps"] for stats in agent_stats.values()) if 'agent_stats' in locals() else 0
-                    
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.markdown("**🏆 Most Active Agent:**")
-                        st.info(f"{most_active_agent}")
-                        
-                        st.markdown("**⚡ Execution Efficiency:**")
-                        if total_time.total_seconds() > 0:
-                            steps_per_second = len(execution_log) / total_time.total_seconds()
-                            st.info(f"{steps_per_second:.2f} steps/second")
-                        else:
-                            st.info("Instant execution")
-                    
-                    with col2:
-                        st.markdown("**🔧 Tool Usage:**")
-                        if total_tools > 0:
-                            st.info(f"{total_tools} tools executed across {len(agents_used)} agents")
-                        else:
-                            st.info("No external tools used")
-                        
-                        st.markdown("**🤝 Collaboration:**")
-                        if handoffs > 0:
-                            st.info(f"{handoffs} handoffs between agents")
-                        else:
-                            st.info("Single agent execution")
+                if error_count > success_count:
+                    recommendations.append("🎯 **Scope**: Consider simplifying the request or using fewer agents")
                 
-                # Show recommendations for improvement (like ReAct)
-                if error_count > 0:
-                    st.markdown("### 🔧 Recommendations for Next Run")
-                    recommendations = []
-                    
-                    if "api" in str([log.get("error", "") for log in execution_log]).lower():
-                        recommendations.append("🔑 **API Keys**: Verify all API keys are valid and have sufficient credits")
-                    
-                    if "timeout" in str([log.get("error", "") for log in execution_log]).lower():
-                        recommendations.append("⏱️ **Complexity**: Try breaking down the request into smaller, more specific tasks")
-                    
-                    if error_count > success_count:
-                        recommendations.append("🎯 **Scope**: Consider simplifying the request or using fewer agents")
-                    
-                    if not recommendations:
-                        recommendations.append("🔄 **Retry**: Try running the same request again - some errors may be temporary")
-                    
-                    for rec in recommendations:
-                        st.info(rec)
-                    
-        except concurrent.futures.TimeoutError:
-            execution_log.append({
-                "timestamp": datetime.now(),
-                "step": "timeout",
-                "agent": "System",
-                "action": "Workflow timed out",
-                "status": "error",
-                "details": "Execution exceeded 60 second timeout",
-                "error": "TimeoutError: Agent workflow timed out"
-            })
+                if not recommendations:
+                    recommendations.append("🔄 **Retry**: Try running the same request again - some errors may be temporary")
+                
+                for rec in recommendations:
+                    st.info(rec)
+                
+        except asyncio.TimeoutError:
+            execution_log.append(LogEntry(
+                t=time.monotonic() - start_mono,
+                step="timeout",
+                agent="System",
+                action="Workflow timed out",
+                status="error",
+                details="Execution exceeded 60 second timeout",
+                error="TimeoutError: Agent workflow timed out"
+            ))
             
+            run_status.update(label="⏰ Agent workflow timed out", state="error", expanded=True)
             st.error("⏰ Agent workflow timed out. Please try again with a simpler request.")
             
             # Still show execution log for debugging
             if execution_log:
-                st.markdown("### 📋 Execution Log (Before Timeout)")
-                for i, log_entry in enumerate(execution_log):
-                    status_icon = "❌" if log_entry["status"] == "error" else "✅" if log_entry["status"] == "success" else "🔄"
-                    timestamp_str = log_entry["timestamp"].strftime("%H:%M:%S.%f")[:-3]
-                    
-                    with st.expander(f"{status_icon} [{timestamp_str}] {log_entry['agent']}: {log_entry['action']}", expanded=False):
-                        st.markdown(f"**Status:** {log_entry['status']}")
-                        if log_entry.get("details"):
-                            st.info(log_entry["details"])
-                        if log_entry.get("error"):
-                            st.error(log_entry["error"])
+                with log_slot.container():
+                    st.markdown("### 📋 Execution Log (Before Timeout)")
+                    render_failed_run_log(execution_log, detailed=detailed_log)
             
         except Exception as e:
-            execution_log.append({
-                "timestamp": datetime.now(),
-                "step": "fatal_error",
-                "agent": "System",
-                "action": "Fatal error occurred",
-                "status": "error",
-                "details": f"Error type: {type(e).__name__}",
-                "error": str(e)
-            })
+            execution_log.append(LogEntry(
+                t=time.monotonic() - start_mono,
+                step="fatal_error",
+                agent="System",
+                action="Fatal error occurred",
+                status="error",
+                details=f"Error type: {type(e).__name__}",
+                error=str(e)
+            ))
             
+            run_status.update(label="❌ Agent workflow failed", state="error", expanded=True)
             st.error(f"❌ Error: {str(e)}")
             
             # Show detailed error information
             with st.expander("🔍 Error Details", expanded=True):
-                st.code(f"""
-Error Type: {type(e).__name__}
-Error Message: {str(e)}
-Execution Time: {datetime.now() - start_time}
-                """)
+                st.code("\n".join((
+                    f"Error Type: {type(e).__name__}",
+                    f"Error Message: {e}",
+                    f"Execution Time: {time.monotonic() - start_mono:.2f}s",
+                )))
             
             # Show execution log for debugging
             if execution_log:
-                st.markdown("### 📋 Execution Log (Before Error)")
-                for i, log_entry in enumerate(execution_log):
-                    status_icon = "❌" if log_entry["status"] == "error" else "✅" if log_entry["status"] == "success" else "🔄"
-                    timestamp_str = log_entry["timestamp"].strftime("%H:%M:%S.%f")[:-3]
-                    
-                    with st.expander(f"{status_icon} [{timestamp_str}] {log_entry['agent']}: {log_entry['action']}", expanded=False):
-                        st.markdown(f"**Status:** {log_entry['status']}")
-                        if log_entry.get("details"):
-                            st.info(log_entry["details"])
-                        if log_entry.get("error"):
-                            st.error(log_entry["error"])
+                with log_slot.container():
+                    st.markdown("### 📋 Execution Log (Before Error)")
+                    render_failed_run_log(execution_log, detailed=detailed_log)
             
             # Provide helpful error guidance
-            if "event loop" in str(e).lower():
-                st.info("💡 This appears to be an asyncio event loop issue. Try refreshing the page and running again.")
-            elif "api" in str(e).lower() or "key" in str(e).lower():
-                st.info("💡 This might be an API key issue. Check that your OpenAI API key is valid and has sufficient credits.")
-            elif "timeout" in str(e).lower():
-                st.info("💡 The request may be too complex. Try a simpler request or increase the timeout.")
-            else:
-                st.info("💡 Try refreshing the page and running again. If the issue persists, check your API keys and internet connection.")
+            st.info(error_guidance(str(e)))
     
     # Code example
     st.markdown("---")
     st.markdown("### 👨‍💻 Want to see the multi-agent code?")
     
     with st.expander("Click to show/hide the OpenAI Agents SDK code"):
-        st.code("""
-from agents import Agent, Runner, function_tool
-import asyncio
-
-# Define tools
-@function_tool
-def search_information(query: str) -> str:
-    # Your search logic here
-    return f"Research findings on {query}"
-
-@function_tool
-def analyze_data(data: str) -> str:
-    # Your analysis logic here
-    return f"Analysis results: {data}"
-
-# Create specialized agents
-research_agent = Agent(
-    name="Research Specialist",
-    instructions="You are a research expert. Find comprehensive information.",
-    tools=[search_information]
-)
-
-analysis_agent = Agent(
-    name="Data Analyst", 
-    instructions="You analyze data and provide insights.",
-    tools=[analyze_data]
-)
-
-writing_agent = Agent(
-    name="Content Writer",
-    instructions="You create polished, engaging content.",
-    tools=[]
-)
-
-# Coordinator agent with handoffs
-coordinator_agent = Agent(
-    name="Project Coordinator",
-    instructions="Coordinate between specialists based on the task.",
-    handoffs=[research_agent, analysis_agent, writing_agent]
-)
-
-# Run the multi-agent workflow
-async def main():
-    result = await Runner.run(
-        coordinator_agent, 
-        "Research renewable energy and create a report"
-    )
-    print(result.final_output)
-
-# For synchronous execution
-result = Runner.run_sync(coordinator_agent, "Your request here")
-print(result.final_output)
-        """, language="python")
+        st.code(_AGENTS_SDK_CODE, language="python")
     
     st.markdown("### 🌐 Adding Exa AI to Multi-Agent Systems")
     with st.expander("Click to show/hide Exa multi-agent integration"):
-        st.code("""
-import exa_py
-import os
-from agents import Agent, Runner, function_tool
-
-# Exa-powered research tools
-@function_tool
-def exa_web_search(query: str) -> str:
-    \"\"\"Real-time web search using Exa AI\"\"\"
-    exa = exa_py.Exa(api_key=os.environ["EXA_API_KEY"])
-    results = exa.search(query=query, num_results=3, text=True, highlights=True)
-    
-    search_summary = f"Web search results for '{query}':\\n\\n"
-    for i, result in enumerate(results.results, 1):
-        search_summary += f"{i}. **{result.title}**\\n"
-        search_summary += f"   URL: {result.url}\\n"
-        if result.highlights:
-            search_summary += f"   Key info: {result.highlights[0][:200]}...\\n"
-        search_summary += "\\n"
-    return search_summary
-
-@function_tool
-def exa_arxiv_search(topic: str) -> str:
-    \"\"\"Search for latest papers on arXiv using Exa AI\"\"\"
-    exa = exa_py.Exa(api_key=os.environ["EXA_API_KEY"])
-    results = exa.search(
-        query=f"{topic} site:arxiv.org",
-        num_results=5,
-        text=True,
-        include_domains=["arxiv.org"]
-    )
-    
-    papers_summary = f"Latest arXiv papers on '{topic}':\\n\\n"
-    for i, result in enumerate(results.results, 1):
-        papers_summary += f"{i}. **{result.title}**\\n"
-        papers_summary += f"   arXiv URL: {result.url}\\n"
-        if result.text:
-            papers_summary += f"   Abstract: {result.text[:250]}...\\n"
-        papers_summary += "\\n"
-    return papers_summary
-
-@function_tool
-def exa_company_research(company_name: str) -> str:
-    \"\"\"Research companies using Exa AI\"\"\"
-    exa = exa_py.Exa(api_key=os.environ["EXA_API_KEY"])
-    results = exa.search(
-        query=f"{company_name} company business model revenue",
-        num_results=3,
-        text=True,
-        category="company"
-    )
-    
-    research_summary = f"Company research for '{company_name}':\\n\\n"
-    for i, result in enumerate(results.results, 1):
-        research_summary += f"{i}. **{result.title}**\\n"
-        research_summary += f"   Source: {result.url}\\n"
-        if result.text:
-            research_summary += f"   Info: {result.text[:300]}...\\n"
-        research_summary += "\\n"
-    return research_summary
-
-# Create specialized Exa-powered agents
-web_research_agent = Agent(
-    name="Exa Web Research Specialist",
-    instructions=\"\"\"You are a web research specialist powered by Exa AI.
-    Your job is to find real-time information from the web, analyze current trends,
-    and provide up-to-date insights. Always use Exa search for current information.\"\"\",
-    tools=[exa_web_search, exa_company_research]
-)
-
-academic_research_agent = Agent(
-    name="Academic Research Specialist",
-    instructions=\"\"\"You are an academic research specialist powered by Exa AI.
-    Your job is to find the latest research papers, analyze academic trends,
-    and summarize cutting-edge findings from arXiv.\"\"\",
-    tools=[exa_arxiv_search]
-)
-
-synthesis_agent = Agent(
-    name="Research Synthesis Analyst",
-    instructions=\"\"\"You are a synthesis analyst. Your job is to:
-    1. Take research from multiple agents (web, academic, etc.)
-    2. Identify patterns and connections across different sources
-    3. Provide comprehensive analysis and strategic insights
-    4. Create actionable recommendations based on all findings\"\"\",
-    tools=[]
-)
-
-# Parallel Research Coordinator
-parallel_coordinator = Agent(
-    name="Parallel Research Coordinator",
-    instructions=\"\"\"You coordinate parallel research across multiple agents.
-    For any research topic, delegate to:
-    - Web Research Specialist for current web information
-    - Academic Research Specialist for latest papers
-    Then hand off to Synthesis Analyst for comprehensive analysis.\"\"\",
-    handoffs=[web_research_agent, academic_research_agent, synthesis_agent]
-)
-
-# Usage example
-async def research_with_exa(topic: str):
-    result = await Runner.run(
-        parallel_coordinator,
-        f"Research the latest developments in {topic} from both web sources and academic papers. Provide comprehensive analysis with strategic insights."
-    )
-    return result.final_output
-
-# Run the research
-result = Runner.run_sync(
-    parallel_coordinator,
-    "Research the latest developments in large language models"
-)
-print(result.final_output)
-        """, language="python")
-        
-        st.markdown("""
-        **🚀 Key Benefits of Exa in Multi-Agent Systems:**
-        
-        **🔄 Parallel Research**: Multiple agents can search different sources simultaneously:
-        - One agent searches web sources
-        - Another searches academic papers  
-        - Third agent searches social media discussions
-        - Fourth agent searches code repositories
-        
-        **🎯 Specialized Expertise**: Each agent becomes an expert in their domain:
-        - **Web Agent**: Current news, trends, company information
-        - **Academic Agent**: Latest research papers, scientific developments
-        - **Social Agent**: Public opinion, expert discussions
-        - **Code Agent**: Implementation examples, benchmarks
-        
-        **🧠 Intelligent Synthesis**: Strategic thinking agent combines all findings:
-        - Identifies patterns across different sources
-        - Connects academic research to practical applications
-        - Provides comprehensive analysis and recommendations
+        st.code(_EXA_INTEGRATION_CODE, language="python")
         
-        **⚡ Real-Time Intelligence**: Unlike static training data, Exa provides:
-        - Current market conditions
-        - Latest research developments
-        - Recent news and trends
-        - Up-to-date social discussions
-        """)
+        st.markdown(_EXA_BENEFITS_MD)
         
-        st.markdown("""
-        **🔑 Setup Instructions:**
-        1. **Install packages**: `pip install exa-py openai-agents`
-        2. **Get API keys**: 
-           - Exa API key from [exa.ai](https://exa.ai/)
-           - OpenAI API key from [platform.openai.com](https://platform.openai.com/)
-        3. **Set environment variables**:
-           ```bash
-           export EXA_API_KEY="your-exa-key-here"
-           export OPENAI_API_KEY="your-openai-key-here"
-           ```
-        4. **Run your multi-agent system** with real-time intelligence!
-        """)
+        st.markdown(_EXA_SETUP_MD)
     
     # Example scenarios
     st.markdown("---")
     st.markdown("### 🎮 Try These Multi-Agent Examples!")
     
     if tool_mode == "exa":
-        example_requests = [
-            "Research the latest developments in diffusion models across arXiv, Twitter discussions, and Papers with Code. Provide strategic analysis on emerging trends and implementation opportunities.",
-            "Investigate current multimodal AI research from academic papers, social media expert opinions, and code repositories. Synthesize findings with deep analytical insights.",
-            "Study recent advances in reinforcement learning from human feedback (RLHF) across all research platforms. Generate strategic recommendations for practical applications.",
-            "Research emerging trends in computer vision and foundation models. Gather insights from papers, community discussions, and implementations for comprehensive analysis.",
-            "Explore the latest in AI safety and alignment research across academic and social platforms. Provide thoughtful analysis on current approaches and future directions."
-        ]
+        example_requests = _EXA_EXAMPLE_REQUESTS
         flow_description = "**Agent flow:** Parallel Research (arXiv + Twitter + Papers with Code) → Strategic Thinking Analysis → Writing"
     else:
-        example_requests = [
-            "Research artificial intelligence and machine learning trends. Provide analysis with insights from multiple perspectives.",
-            "Investigate renewable energy technologies and market opportunities. Analyze data from different research angles.",
-            "Study quantum computing developments and potential applications. Generate strategic recommendations.",
-            "Research biotechnology advances and their implications. Provide comprehensive analysis and insights.",
-            "Explore space exploration technologies and future missions. Analyze trends and opportunities."
-        ]
+        example_requests = _MOCK_EXAMPLE_REQUESTS
         flow_description = "**Agent flow:** Mock Research → Mock Analysis → Writing (Demonstration Mode)"
     
     st.markdown("**These examples showcase different agents collaborating:**")
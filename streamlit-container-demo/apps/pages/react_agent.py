@@ -1,37 +1,303 @@
 import streamlit as st
 import openai
+import httpx
 import json
 import random
+import re
+import ast
+import operator
+import asyncio
+import os
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache, partial
 import time
 from pydantic import BaseModel
 from typing import List, Optional
 
-# Cost tracking (approximate costs in USD)
+# Cost tracking (costs in USD); prompt tokens served from OpenAI's prompt cache bill at half the input rate
 OPENAI_COSTS = {
     "gpt-4o-mini": {
         "input": 0.00015 / 1000,  # per token
+        "cached_input": 0.000075 / 1000,  # per token
         "output": 0.0006 / 1000   # per token
     }
 }
 
-def estimate_tokens(text):
-    """Rough token estimation (1 token ≈ 4 characters)"""
-    return len(text) // 4
-
-def calculate_cost(model, input_text, output_text):
-    """Calculate approximate cost for OpenAI API call"""
-    if model not in OPENAI_COSTS:
-        return "Not available"
+def calculate_cost(model, usage):
+    """Calculate the cost of an OpenAI API call from the token usage it reported, as a display label and a number (both None when unpriced)"""
+    prices = OPENAI_COSTS.get(model)
+    if prices is None or usage is None:
+        return {"api_cost": None, "api_cost_usd": None}
     
-    input_tokens = estimate_tokens(input_text)
-    output_tokens = estimate_tokens(output_text)
+    details = usage.prompt_tokens_details
+    cached_tokens = (details.cached_tokens or 0) if details else 0
     
-    input_cost = input_tokens * OPENAI_COSTS[model]["input"]
-    output_cost = output_tokens * OPENAI_COSTS[model]["output"]
-    total_cost = input_cost + output_cost
+    input_cost = (usage.prompt_tokens - cached_tokens) * prices["input"]
+    cached_cost = cached_tokens * prices["cached_input"]
+    output_cost = usage.completion_tokens * prices["output"]
+    total_cost = input_cost + cached_cost + output_cost
     
-    return f"${total_cost:.6f} (≈{input_tokens + output_tokens} tokens)"
+    return {
+        "api_cost": f"${total_cost:.6f} ({usage.total_tokens} tokens, {cached_tokens} cached)",
+        "api_cost_usd": total_cost
+    }
+
+# Use orjson for tool arguments and their display when it is installed
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def parse_json(text):
+    """Parse JSON with orjson when available, else the stdlib parser"""
+    return orjson.loads(text) if ORJSON_AVAILABLE else json.loads(text)
+
+def format_json(value):
+    """Pretty-print JSON for display with orjson when available, else the stdlib encoder"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(value, indent=2)
+
+def canonical_json(value):
+    """Serialize JSON compactly with sorted keys, for use as a stable cache key"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value, option=orjson.OPT_SORT_KEYS).decode()
+    return json.dumps(value, sort_keys=True, separators=(",", ":"))
+
+# Seconds each tool's result is reused for identical arguments within a session (None: no expiry);
+# unlisted tools, such as save_note, always run
+_TOOL_CACHE_TTL = {
+    "search_web": 600,
+    "get_weather": 600,
+    "calculate": None,  # pure, never goes stale
+    "exa_web_search": 300,
+    "exa_company_research": 300,
+    "exa_multi_company_research": 300,
+    "exa_arxiv_search": 300
+}
+_TOOL_CACHE_SIZE = 128
+
+# Most companies one exa_multi_company_research call will search
+_MULTI_COMPANY_LIMIT = 5
+
+# Cheap local tools whose short results can end a run without another model call (opt-in)
+_FAST_TOOLS = {"calculate"}
+_FAST_RESULT_LIMIT = 100
+
+# Minimum seconds between redraws of a streamed response
+_STREAM_REFRESH_INTERVAL = 0.05
+
+# Fixed system prompt: every request starts with the same bytes, so OpenAI can cache the prefix
+_SYSTEM_PROMPT = """You are a helpful ReAct agent. You can think step by step, use tools, and reason about what to do next.
+
+For each step:
+1. Think about what you need to do
+2. Use appropriate tools if needed. When the task has independent parts, request all of their tool calls in a single message so they run in parallel; only wait for a result when a later tool call depends on it
+3. Analyze the results
+4. Decide on next steps
+5. Continue until you have fully addressed the user's request
+
+Be thorough and use multiple tools when helpful."""
+
+# Recent messages kept when an oversized conversation is trimmed; trimming only happens past twice this
+# many messages, or once the conversation's estimated tokens pass the budget
+_MESSAGE_WINDOW = 20
+_CONTEXT_TOKEN_BUDGET = 100_000
+
+# Count tokens with gpt-4o-mini's tokenizer when tiktoken is installed
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+@st.cache_resource
+def get_tokenizer():
+    """Load the gpt-4o-mini tokenizer once per process (None if it cannot be loaded, e.g. offline on first use)"""
+    try:
+        return tiktoken.encoding_for_model("gpt-4o-mini")
+    except Exception:
+        return None
+
+def count_tokens(message):
+    """Count the tokens in a message's content and tool-call arguments, estimating four characters a token without a tokenizer"""
+    text = (message.get("content") or "") + "".join(call["function"]["arguments"] for call in message.get("tool_calls", ()))
+    tokenizer = get_tokenizer() if TIKTOKEN_AVAILABLE else None
+    if tokenizer is not None:
+        return len(tokenizer.encode(text))
+    return len(text) // 4
+
+def trim_messages(messages):
+    """Cut a conversation down to the system prompt, the task and the latest turns, starting the kept turns at an assistant message"""
+    start = max(2, len(messages) - _MESSAGE_WINDOW)
+    # Tool results must follow the assistant message that requested them, so move the cut back to
+    # the assistant turn they belong to; a turn with many tool calls is kept whole, past the window
+    while start > 2 and messages[start]["role"] != "assistant":
+        start -= 1
+    return messages[:2] + messages[start:]
+
+# Mock search data, matched against a query with one precompiled pattern
+_MOCK_SEARCH_RESULTS = {
+    "python": "Python is a high-level programming language created by Guido van Rossum in 1991. It's known for its simplicity and readability.",
+    "weather": "Current weather data shows mixed conditions across different cities. Temperature ranges from 15-30°C globally.",
+    "stock": "Stock markets are showing varied performance today. Tech stocks are generally up while energy stocks are mixed.",
+    "news": "Latest news includes developments in AI technology, climate initiatives, and global economic updates.",
+    "tokyo": "Tokyo is the capital of Japan, population ~14 million. Known for technology, culture, and cuisine.",
+    "cooking": "Cooking tips: Start with fresh ingredients, season properly, and don't overcook vegetables."
+}
+_SEARCH_TOPIC_RE = re.compile("|".join(map(re.escape, _MOCK_SEARCH_RESULTS)), re.IGNORECASE)
+
+# Characters the calculator tool accepts (digits, arithmetic, ^ for exponentiation, whitespace),
+# and the arithmetic it may evaluate
+_CALCULATOR_INPUT_RE = re.compile(r"[0-9+\-*/.()^\s]*")
+_BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Pow: operator.pow
+}
+_UNARY_OPERATORS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+
+@lru_cache(maxsize=256)
+def parse_expression(expression):
+    """Parse an arithmetic expression, reusing the tree for repeated expressions"""
+    return ast.parse(expression, mode="eval").body
+
+def evaluate_node(node):
+    """Evaluate a parsed arithmetic expression made only of numbers and arithmetic operators"""
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        return node.value
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+        return _BINARY_OPERATORS[type(node.op)](evaluate_node(node.left), evaluate_node(node.right))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+        return _UNARY_OPERATORS[type(node.op)](evaluate_node(node.operand))
+    raise ValueError("Unsupported expression")
+
+# Mock tools for the ReAct agent; they depend on nothing session-specific
+def search_web(query: str) -> str:
+    """Mock web search function"""
+    # Use the first known topic mentioned in the query
+    match = _SEARCH_TOPIC_RE.search(query)
+    if match:
+        return f"Search results for '{query}': {_MOCK_SEARCH_RESULTS[match.group(0).lower()]}"
+    
+    return f"Search results for '{query}': Found general information about this topic."
+
+def get_weather(city: str) -> str:
+    """Get weather for a city"""
+    weather_options = ["sunny ☀️", "cloudy ☁️", "rainy 🌧️", "snowy ❄️", "partly cloudy ⛅"]
+    temp = random.randint(10, 35)
+    weather = random.choice(weather_options)
+    humidity = random.randint(30, 80)
+    return f"Weather in {city}: {weather}, {temp}°C, humidity {humidity}%"
+
+def calculate(expression: str) -> str:
+    """Perform calculations"""
+    try:
+        # Allow common mathematical characters including ^ for exponentiation
+        if not _CALCULATOR_INPUT_RE.fullmatch(expression):
+            return "Error: Invalid characters in expression"
+        
+        # Store original expression for display
+        original_expression = expression
+        
+        # Replace ^ with ** for Python exponentiation
+        python_expression = expression.replace('^', '**')
+        result = evaluate_node(parse_expression(python_expression))
+        
+        # Format result nicely - avoid LaTeX conflicts
+        return f"Calculation result: {original_expression} = {result}"
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+def save_note(content: str) -> str:
+    """Save a note (mock function)"""
+    return f"✅ Note saved: '{content[:50]}...' at {datetime.now().strftime('%H:%M:%S')}"
+
+_MOCK_FUNCTIONS = {
+    "search_web": search_web,
+    "get_weather": get_weather,
+    "calculate": calculate,
+    "save_note": save_note
+}
+
+def function_schema(name, description, parameter, parameter_description):
+    """Build the OpenAI function-tool schema for a tool taking one string parameter"""
+    return {
+        "type": "function",
+        "function": {
+            "name": name,
+            "description": description,
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    parameter: {"type": "string", "description": parameter_description}
+                },
+                "required": [parameter]
+            }
+        }
+    }
+
+@st.cache_resource
+def build_toolsets():
+    """Build the tool schemas offered to the model per tool mode, once per process rather than per rerun"""
+    schemas = {
+        schema["function"]["name"]: schema
+        for schema in (
+            function_schema("search_web", "Search the web for information on any topic (mock data)", "query", "Search query"),
+            function_schema("exa_web_search", "Search the web for real-time information using Exa AI", "query", "Search query"),
+            function_schema("exa_company_research", "Research companies and their business models using Exa AI", "company_name", "Company name to research"),
+            function_schema("exa_arxiv_search", "Search for latest academic papers on arXiv using Exa AI", "topic", "Research topic to search for"),
+            function_schema("get_weather", "Get current weather for a city", "city", "City name"),
+            function_schema("calculate", "Perform mathematical calculations", "expression", "Math expression"),
+            function_schema("save_note", "Save important information as a note", "content", "Note content to save")
+        )
+    }
+    schemas["exa_multi_company_research"] = {
+        "type": "function",
+        "function": {
+            "name": "exa_multi_company_research",
+            "description": "Research several companies at once using Exa AI; prefer this over repeated exa_company_research calls",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "companies": {"type": "array", "items": {"type": "string"}, "maxItems": _MULTI_COMPANY_LIMIT, "description": f"Company names to research (up to {_MULTI_COMPANY_LIMIT})"}
+                },
+                "required": ["companies"]
+            }
+        }
+    }
+    return {
+        "exa": [schemas[name] for name in ("exa_web_search", "exa_company_research", "exa_multi_company_research", "exa_arxiv_search", "get_weather", "calculate", "save_note")],
+        "mock": [schemas[name] for name in ("search_web", "get_weather", "calculate", "save_note")]
+    }
+
+# Check tool arguments against their schemas before any tool runs, when fastjsonschema is installed
+try:
+    import fastjsonschema
+    FASTJSONSCHEMA_AVAILABLE = True
+except ImportError:
+    FASTJSONSCHEMA_AVAILABLE = False
+
+@st.cache_resource
+def tool_validators():
+    """Compile every tool's parameter schema into a validator once per process, keyed by tool name"""
+    return {
+        schema["function"]["name"]: fastjsonschema.compile(schema["function"]["parameters"])
+        for toolset in build_toolsets().values()
+        for schema in toolset
+    }
+
+@st.cache_resource
+def prompt_prefix_fingerprint(tool_mode):
+    """Hash the system prompt and tool schemas that lead every request, so any change to the cached prefix shows"""
+    prefix = canonical_json({"system": _SYSTEM_PROMPT, "tools": build_toolsets()[tool_mode]})
+    return hashlib.sha256(prefix.encode()).hexdigest()[:12]
 
 st.markdown("# 🔄 ReAct Agent (Reasoning + Acting)")
 st.markdown("---")
@@ -60,8 +326,43 @@ try:
 except ImportError:
     EXA_AVAILABLE = False
 
+@st.cache_resource
+def get_exa_client(api_key):
+    """Share one Exa client per API key across reruns, sessions and tool calls"""
+    return exa_py.Exa(api_key=api_key)
+
+# HTTP/2 multiplexes requests over one connection to OpenAI when the h2 package is installed
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Connection pool and timeouts for OpenAI's HTTP clients: idle connections stay open across
+# the ReAct loop's calls, and an unreachable host fails fast instead of after the full timeout
+_OPENAI_HTTP_OPTIONS = {
+    "http2": HTTP2_AVAILABLE,
+    "limits": httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=30.0),
+    "timeout": httpx.Timeout(60.0, connect=5.0)
+}
+
+@st.cache_resource
+def get_openai_client(api_key):
+    """Share one OpenAI client, and so one HTTP connection pool, per API key across reruns and sessions"""
+    return openai.Client(api_key=api_key, http_client=openai.DefaultHttpxClient(**_OPENAI_HTTP_OPTIONS))
+
+# Upper bound on blocking tool calls running at once in one agent run, and on tool threads in this
+# process; each run gets its own limit, so one run's slow searches never queue another's tools
+_TOOL_CONCURRENCY_LIMIT = int(os.getenv("TOOL_CONCURRENCY_LIMIT", "5"))
+_TOOL_POOL_SIZE = int(os.getenv("TOOL_POOL_SIZE", "32"))
+
+@st.cache_resource
+def tool_pool():
+    """Share one warm pool of tool threads across runs and sessions"""
+    return ThreadPoolExecutor(max_workers=_TOOL_POOL_SIZE, thread_name_prefix="react-tools")
+
 if api_key:
-    client = openai.Client(api_key=api_key)
+    client = get_openai_client(api_key)
     
     # Pydantic models for structured outputs
     class ReActStep(BaseModel):
@@ -104,332 +405,196 @@ if api_key:
         st.info("🔧 **Mock Tools Active**: Using demonstration tools with sample data")
         tool_mode = "mock"
     
-    # Enhanced tools for ReAct agent
-    def search_web(query: str) -> str:
-        """Mock web search function"""
-        search_results = {
-            "python": "Python is a high-level programming language created by Guido van Rossum in 1991. It's known for its simplicity and readability.",
-            "weather": f"Current weather data shows mixed conditions across different cities. Temperature ranges from 15-30°C globally.",
-            "stock": "Stock markets are showing varied performance today. Tech stocks are generally up while energy stocks are mixed.",
-            "news": "Latest news includes developments in AI technology, climate initiatives, and global economic updates.",
-            "tokyo": "Tokyo is the capital of Japan, population ~14 million. Known for technology, culture, and cuisine.",
-            "cooking": "Cooking tips: Start with fresh ingredients, season properly, and don't overcook vegetables."
-        }
-        
-        # Find the most relevant result
-        for key, result in search_results.items():
-            if key.lower() in query.lower():
-                return f"Search results for '{query}': {result}"
-        
-        return f"Search results for '{query}': Found general information about this topic."
-    
-    def get_weather(city: str) -> str:
-        """Get weather for a city"""
-        weather_options = ["sunny ☀️", "cloudy ☁️", "rainy 🌧️", "snowy ❄️", "partly cloudy ⛅"]
-        temp = random.randint(10, 35)
-        weather = random.choice(weather_options)
-        humidity = random.randint(30, 80)
-        return f"Weather in {city}: {weather}, {temp}°C, humidity {humidity}%"
-    
-    def calculate(expression: str) -> str:
-        """Perform calculations"""
-        try:
-            # Allow common mathematical characters including ^ for exponentiation
-            allowed_chars = set('0123456789+-*/.()^')
-            if not all(c in allowed_chars or c.isspace() for c in expression):
-                return "Error: Invalid characters in expression"
-            
-            # Store original expression for display
-            original_expression = expression
-            
-            # Replace ^ with ** for Python exponentiation
-            python_expression = expression.replace('^', '**')
-            result = eval(python_expression)
-            
-            # Format result nicely - avoid LaTeX conflicts
-            return f"Calculation result: {original_expression} = {result}"
-        except Exception as e:
-            return f"Error: {str(e)}"
-    
-    def save_note(content: str) -> str:
-        """Save a note (mock function)"""
-        return f"✅ Note saved: '{content[:50]}...' at {datetime.now().strftime('%H:%M:%S')}"
-    
-    # Real Exa AI tools
+    # Real Exa AI tools; each fetches results and their text in one search_and_contents call.
+    # Failures raise, so they surface as tool errors and are never kept in the tool cache.
     def exa_web_search(query: str) -> str:
         """Real-time web search using Exa AI"""
         if not (EXA_AVAILABLE and exa_api_key):
             return "Exa search not available. Please enable Exa tools and ensure API key is set."
         
-        try:
-            import os
-            os.environ["EXA_API_KEY"] = exa_api_key
-            exa = exa_py.Exa(api_key=exa_api_key)
-            
-            results = exa.search(
-                query=query,
-                num_results=3,
-                use_autoprompt=True
-            )
-            
-            # Get content for the results
-            try:
-                contents = exa.get_contents([result.id for result in results.results])
-                content_map = {content.id: content.text for content in contents.contents if content.text}
-            except:
-                content_map = {}
-            
-            search_summary = f"🌐 Exa web search results for '{query}':\n\n"
-            for i, result in enumerate(results.results, 1):
-                search_summary += f"{i}. **{result.title}**\n"
-                search_summary += f"   URL: {result.url}\n"
-                if result.id in content_map and content_map[result.id]:
-                    search_summary += f"   Summary: {content_map[result.id][:200]}...\n"
-                search_summary += "\n"
-            
-            return search_summary
-            
-        except Exception as e:
-            return f"Exa search error: {str(e)}. Using fallback search instead."
+        results = get_exa_client(exa_api_key).search_and_contents(
+            query,
+            num_results=3,
+            use_autoprompt=True,
+            text={"max_characters": 200}
+        )
+        
+        parts = [f"🌐 Exa web search results for '{query}':\n\n"]
+        for i, result in enumerate(results.results, 1):
+            parts.append(f"{i}. **{result.title}**\n")
+            parts.append(f"   URL: {result.url}\n")
+            if result.text:
+                parts.append(f"   Summary: {result.text}...\n")
+            parts.append("\n")
+        
+        return "".join(parts)
     
     def exa_company_research(company_name: str) -> str:
         """Research companies using Exa AI"""
         if not (EXA_AVAILABLE and exa_api_key):
             return f"Exa company research not available for {company_name}."
         
-        try:
-            import os
-            os.environ["EXA_API_KEY"] = exa_api_key
-            exa = exa_py.Exa(api_key=exa_api_key)
-            
-            results = exa.search(
-                query=f"{company_name} company business model revenue news",
-                num_results=3,
-                use_autoprompt=True
-            )
-            
-            # Get content for the results
-            try:
-                contents = exa.get_contents([result.id for result in results.results])
-                content_map = {content.id: content.text for content in contents.contents if content.text}
-            except:
-                content_map = {}
-            
-            research_summary = f"🏢 Exa company research for '{company_name}':\n\n"
-            for i, result in enumerate(results.results, 1):
-                research_summary += f"{i}. **{result.title}**\n"
-                research_summary += f"   Source: {result.url}\n"
-                if result.id in content_map and content_map[result.id]:
-                    research_summary += f"   Info: {content_map[result.id][:300]}...\n"
-                research_summary += "\n"
-            
-            return research_summary
-            
-        except Exception as e:
-            return f"Exa company research error: {str(e)}."
+        results = get_exa_client(exa_api_key).search_and_contents(
+            f"{company_name} company business model revenue news",
+            num_results=3,
+            use_autoprompt=True,
+            text={"max_characters": 300}
+        )
+        
+        parts = [f"🏢 Exa company research for '{company_name}':\n\n"]
+        for i, result in enumerate(results.results, 1):
+            parts.append(f"{i}. **{result.title}**\n")
+            parts.append(f"   Source: {result.url}\n")
+            if result.text:
+                parts.append(f"   Info: {result.text}...\n")
+            parts.append("\n")
+        
+        return "".join(parts)
+    
+    async def exa_multi_company_research(companies: List[str]) -> str:
+        """Research several companies with concurrent Exa searches"""
+        # Schema validation is optional, so check the shape here: a bare string would
+        # otherwise be searched one character at a time
+        if not isinstance(companies, list) or not all(isinstance(company, str) for company in companies):
+            raise ValueError("companies must be a list of company names")
+        # Repeats are searched once, and one call starts at most a few searches
+        companies = list(dict.fromkeys(company.strip() for company in companies if company.strip()))[:_MULTI_COMPANY_LIMIT]
+        # Each search takes its own tool slot; any failure fails the whole call
+        summaries = await asyncio.gather(*(run_blocking(exa_company_research, company) for company in companies))
+        return "\n".join(summaries)
     
     def exa_arxiv_search(topic: str) -> str:
         """Search for latest papers on arXiv using Exa AI"""
         if not (EXA_AVAILABLE and exa_api_key):
             return f"Exa arXiv search not available for {topic}."
         
-        try:
-            import os
-            os.environ["EXA_API_KEY"] = exa_api_key
-            exa = exa_py.Exa(api_key=exa_api_key)
-            
-            results = exa.search(
-                query=f"{topic} site:arxiv.org",
-                num_results=3,
-                use_autoprompt=True,
-                include_domains=["arxiv.org"]
-            )
-            
-            # Get content for the results
-            try:
-                contents = exa.get_contents([result.id for result in results.results])
-                content_map = {content.id: content.text for content in contents.contents if content.text}
-            except:
-                content_map = {}
-            
-            papers_summary = f"📚 Latest arXiv papers on '{topic}':\n\n"
-            for i, result in enumerate(results.results, 1):
-                papers_summary += f"{i}. **{result.title}**\n"
-                papers_summary += f"   arXiv URL: {result.url}\n"
-                if result.id in content_map and content_map[result.id]:
-                    papers_summary += f"   Abstract: {content_map[result.id][:250]}...\n"
-                papers_summary += "\n"
-            
-            return papers_summary
-            
-        except Exception as e:
-            return f"Exa arXiv search error: {str(e)}."
+        results = get_exa_client(exa_api_key).search_and_contents(
+            f"{topic} site:arxiv.org",
+            num_results=3,
+            use_autoprompt=True,
+            include_domains=["arxiv.org"],
+            text={"max_characters": 250}
+        )
+        
+        parts = [f"📚 Latest arXiv papers on '{topic}':\n\n"]
+        for i, result in enumerate(results.results, 1):
+            parts.append(f"{i}. **{result.title}**\n")
+            parts.append(f"   arXiv URL: {result.url}\n")
+            if result.text:
+                parts.append(f"   Abstract: {result.text}...\n")
+            parts.append("\n")
+        
+        return "".join(parts)
     
-    # Tool definitions based on mode
+    # Tool schemas are built once per process; only the Exa functions depend on this session
+    tools = build_toolsets()[tool_mode]
     if tool_mode == "exa":
-        # Exa AI tools
-        tools = [
-            {
-                "type": "function",
-                "function": {
-                    "name": "exa_web_search",
-                    "description": "Search the web for real-time information using Exa AI",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "query": {"type": "string", "description": "Search query"}
-                        },
-                        "required": ["query"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "exa_company_research",
-                    "description": "Research companies and their business models using Exa AI",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "company_name": {"type": "string", "description": "Company name to research"}
-                        },
-                        "required": ["company_name"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "exa_arxiv_search",
-                    "description": "Search for latest academic papers on arXiv using Exa AI",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "topic": {"type": "string", "description": "Research topic to search for"}
-                        },
-                        "required": ["topic"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_weather",
-                    "description": "Get current weather for a city",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "city": {"type": "string", "description": "City name"}
-                        },
-                        "required": ["city"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "calculate",
-                    "description": "Perform mathematical calculations",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "expression": {"type": "string", "description": "Math expression"}
-                        },
-                        "required": ["expression"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "save_note",
-                    "description": "Save important information as a note",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "content": {"type": "string", "description": "Note content to save"}
-                        },
-                        "required": ["content"]
-                    }
-                }
-            }
-        ]
-        
         available_functions = {
             "exa_web_search": exa_web_search,
             "exa_company_research": exa_company_research,
+            "exa_multi_company_research": exa_multi_company_research,
             "exa_arxiv_search": exa_arxiv_search,
             "get_weather": get_weather,
             "calculate": calculate,
             "save_note": save_note
         }
     else:
-        # Mock tools
-        tools = [
-            {
-                "type": "function",
-                "function": {
-                    "name": "search_web",
-                    "description": "Search the web for information on any topic (mock data)",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "query": {"type": "string", "description": "Search query"}
-                        },
-                        "required": ["query"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_weather",
-                    "description": "Get current weather for a city",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "city": {"type": "string", "description": "City name"}
-                        },
-                        "required": ["city"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "calculate",
-                    "description": "Perform mathematical calculations",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "expression": {"type": "string", "description": "Math expression"}
-                        },
-                        "required": ["expression"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "save_note",
-                    "description": "Save important information as a note",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "content": {"type": "string", "description": "Note content to save"}
-                        },
-                        "required": ["content"]
-                    }
-                }
-            }
-        ]
+        available_functions = _MOCK_FUNCTIONS
+    
+    tool_cache = st.session_state.setdefault("react_tool_cache", {})
+    
+    # The page script runs afresh for every run, so this limit is per run rather than process-wide
+    tool_slots = asyncio.Semaphore(_TOOL_CONCURRENCY_LIMIT)
+    
+    async def run_blocking(function, *args, **kwargs):
+        """Run a blocking tool on the shared pool while holding one of this run's tool slots"""
+        async with tool_slots:
+            return await asyncio.get_running_loop().run_in_executor(tool_pool(), partial(function, *args, **kwargs))
+    
+    async def call_tool(name, arguments):
+        """Parse one tool call's arguments and run it on a worker thread, returning (args, result, served_from_cache)"""
+        args = parse_json(arguments)
+        # Reject arguments that break the schema before a tool (and any API call it makes) runs;
+        # the error goes back to the model as this call's result
+        if FASTJSONSCHEMA_AVAILABLE and name in tool_validators():
+            try:
+                tool_validators()[name](args)
+            except fastjsonschema.JsonSchemaException as e:
+                raise ValueError(f"Arguments do not match the {name} schema: {e.message}") from e
+        key = (name, canonical_json(args))
+        cacheable = reuse_tool_results and name in _TOOL_CACHE_TTL
+        cached = tool_cache.get(key) if cacheable else None
+        if cached and (_TOOL_CACHE_TTL[name] is None or time.monotonic() - cached[0] < _TOOL_CACHE_TTL[name]):
+            return args, cached[1], True
         
-        available_functions = {
-            "search_web": search_web,
-            "get_weather": get_weather,
-            "calculate": calculate,
-            "save_note": save_note
-        }
+        # Blocking tools queue for one of this run's tool slots; async tools take slots for
+        # their own blocking work, so they run on the event loop without holding one
+        function = available_functions[name]
+        if asyncio.iscoroutinefunction(function):
+            result = await function(**args)
+        else:
+            result = await run_blocking(function, **args)
+        if cacheable:
+            tool_cache.pop(key, None)
+            tool_cache[key] = (time.monotonic(), result)
+            # Evict the oldest entries once the session cache is full
+            while len(tool_cache) > _TOOL_CACHE_SIZE:
+                tool_cache.pop(next(iter(tool_cache)))
+        return args, result, False
+    
+    async def stream_completion(client, placeholder, **request):
+        """Stream a chat completion into a placeholder, starting each tool call as soon as it is complete; returns (message, usage, tool tasks in order)"""
+        stream = await client.chat.completions.create(stream=True, stream_options={"include_usage": True}, **request)
+        content = []
+        pending_calls = {}
+        tool_tasks = []
+        usage = None
+        finish_reason = None
+        last_draw = 0.0
+        
+        def start_tool_calls(upto):
+            # Tool calls stream one after another, so every call before index `upto` is complete
+            for index in range(len(tool_tasks), upto):
+                function = pending_calls[index]["function"]
+                tool_tasks.append(asyncio.create_task(call_tool(function["name"], function["arguments"])))
+        
+        try:
+            async for chunk in stream:
+                # Usage arrives on a final chunk with no choices
+                if chunk.usage:
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                finish_reason = chunk.choices[0].finish_reason or finish_reason
+                delta = chunk.choices[0].delta
+                if delta.content:
+                    content.append(delta.content)
+                    if time.monotonic() - last_draw >= _STREAM_REFRESH_INTERVAL:
+                        placeholder.markdown("".join(content))
+                        last_draw = time.monotonic()
+                # Tool call names and arguments arrive piecewise, keyed by their index
+                for tool_call in delta.tool_calls or ():
+                    start_tool_calls(tool_call.index)
+                    call = pending_calls.setdefault(tool_call.index, {"id": None, "type": "function", "function": {"name": "", "arguments": ""}})
+                    if tool_call.id:
+                        call["id"] = tool_call.id
+                    if tool_call.function:
+                        call["function"]["name"] += tool_call.function.name or ""
+                        call["function"]["arguments"] += tool_call.function.arguments or ""
+            # A response cut off at the token limit may end in half-written tool arguments
+            if finish_reason == "length":
+                raise RuntimeError("Response was cut off at the output token limit; retry with a larger max_tokens")
+            start_tool_calls(len(pending_calls))
+        except BaseException:
+            # Don't leave tools running for a response that never completed
+            for task in tool_tasks:
+                task.cancel()
+            raise
+        
+        message = {"role": "assistant", "content": "".join(content) or None}
+        if pending_calls:
+            message["tool_calls"] = [pending_calls[index] for index in sorted(pending_calls)]
+        return message, usage, tool_tasks
     
     st.markdown("### 🛠️ Available Tools")
     
@@ -470,6 +635,16 @@ if api_key:
     )
     
     max_iterations = st.slider("Maximum thinking iterations:", 1, 10, 5)
+    reuse_tool_results = st.toggle(
+        "Reuse cached tool results",
+        value=True,
+        help="Serve repeated tool calls with identical arguments from this session's cache instead of running them again"
+    )
+    fast_finalize = st.toggle(
+        "Finish on a lone calculation",
+        value=False,
+        help="When a step's only tool call is a quick calculation with a short result, use it as the final answer instead of asking the model again"
+    )
     
     if st.button("🚀 Start ReAct Agent", type="primary"):
         try:
@@ -477,216 +652,274 @@ if api_key:
             
             # Initialize conversation
             messages = [
-                {
-                    "role": "system", 
-                    "content": """You are a helpful ReAct agent. You can think step by step, use tools, and reason about what to do next.
-
-For each step:
-1. Think about what you need to do
-2. Use appropriate tools if needed
-3. Analyze the results
-4. Decide on next steps
-5. Continue until you have fully addressed the user's request
-
-Be thorough and use multiple tools when helpful."""
-                },
+                {"role": "system", "content": _SYSTEM_PROMPT},
                 {"role": "user", "content": user_prompt}
             ]
             
-            iteration = 0
             execution_steps = []
             
-            # Create placeholder for real-time updates
-            live_output = st.empty()
+            # The status label tracks progress; each step's live view gets its own placeholder
+            # (outside the status, which cannot hold the steps' expanders) and stays visible
+            run_status = st.status("🔄 ReAct agent running...")
+            live_view = st.empty()
+            live_steps = live_view.container()
             
             with st.container():
-                while iteration < max_iterations:
-                    iteration += 1
-                    step_data = {
-                        "iteration": iteration,
-                        "thinking": None,
-                        "tool_calls": [],
-                        "final_response": None,
-                        "error": None,
-                        "api_cost": None,
-                        "model_used": "gpt-4o-mini"
-                    }
-                    
-                    try:
-                        # Show current step status
-                        with live_output.container():
-                            st.markdown(f"### 🔄 Step {iteration} - AI is thinking...")
+                async def run_react_loop():
+                    """Run the ReAct loop on asyncio so each step's tool calls can run concurrently"""
+                    iteration = 0
+                    # The conversation only grows by appending, so each step shows just the messages
+                    # added since the previous request, and the prompt size comes from reported usage
+                    shown_messages = 0
+                    prompt_tokens = None
+                    prefix_fingerprint = prompt_prefix_fingerprint(tool_mode)
+                    # Messages never change once appended, so each is tokenized only once per run
+                    token_counts = {}
+                    # Async connections are bound to this run's event loop, so the async client (and its
+                    # pool) lives for the run and every iteration reuses its keep-alive connections
+                    async with openai.AsyncOpenAI(api_key=api_key, http_client=openai.DefaultAsyncHttpxClient(**_OPENAI_HTTP_OPTIONS)) as client:
+                        while iteration < max_iterations:
+                            iteration += 1
+                            run_status.update(label=f"🔄 Step {iteration} of up to {max_iterations}...")
+                            live_output = live_steps.empty()
+                            step_data = {
+                                "iteration": iteration,
+                                "thinking": None,
+                                "tool_calls": [],
+                                "final_response": None,
+                                "error": None,
+                                "api_cost": None,
+                                "api_cost_usd": None,
+                                "model_used": "gpt-4o-mini"
+                            }
                             
-                            # Show the current messages being sent to LLM
-                            with st.expander(f"📤 LLM Input (Step {iteration})", expanded=True):
-                                st.markdown("**Messages being sent to LLM:**")
-                                for i, msg in enumerate(messages):
-                                    role = msg.get("role", "unknown")
-                                    content = msg.get("content", "")
+                            try:
+                                # The conversation is append-only, so each request extends the previous one's cached
+                                # prefix; past two windows (or the token budget) it is trimmed in one jump, costing
+                                # one cache miss per trim
+                                for msg in messages:
+                                    if id(msg) not in token_counts:
+                                        token_counts[id(msg)] = count_tokens(msg)
+                                context_tokens = sum(token_counts[id(msg)] for msg in messages)
+                                if len(messages) > 2 * _MESSAGE_WINDOW or context_tokens > _CONTEXT_TOKEN_BUDGET:
+                                    messages[:] = trim_messages(messages)
+                                    shown_messages = 0
+                                    # Drop trimmed messages, whose ids may be reused by new ones
+                                    token_counts = {id(msg): token_counts[id(msg)] for msg in messages}
+                                    context_tokens = sum(token_counts.values())
+                                
+                                # Show current step status
+                                with live_output.container():
+                                    st.markdown(f"### 🔄 Step {iteration} - AI is thinking...")
                                     
-                                    if role == "system":
-                                        st.info(f"**System:** {content}")
-                                    elif role == "user":
-                                        st.success(f"**User:** {content}")
-                                    elif role == "assistant":
-                                        if content:
-                                            st.warning(f"**Assistant:** {content}")
-                                        if msg.get("tool_calls"):
-                                            st.warning(f"**Assistant:** [Used {len(msg['tool_calls'])} tools]")
-                                    elif role == "tool":
-                                        tool_name = msg.get("name", "unknown")
-                                        st.error(f"**Tool ({tool_name}):** {content[:100]}...")
+                                    # Show the current messages being sent to LLM
+                                    with st.expander(f"📤 LLM Input (Step {iteration})", expanded=True):
+                                        if shown_messages:
+                                            st.markdown(f"**New messages being sent to LLM:** follows {shown_messages} unchanged earlier messages ({prompt_tokens or 'unknown'} prompt tokens on the last request, ~{context_tokens} message tokens now)")
+                                        else:
+                                            st.markdown("**Messages being sent to LLM:**")
+                                        for msg in messages[shown_messages:]:
+                                            role = msg.get("role", "unknown")
+                                            content = msg.get("content", "")
+                                            
+                                            if role == "system":
+                                                st.info(f"**System:** {content}")
+                                            elif role == "user":
+                                                st.success(f"**User:** {content}")
+                                            elif role == "assistant":
+                                                if content:
+                                                    st.warning(f"**Assistant:** {content}")
+                                                if msg.get("tool_calls"):
+                                                    st.warning(f"**Assistant:** [Used {len(msg['tool_calls'])} tools]")
+                                            elif role == "tool":
+                                                tool_name = msg.get("name", "unknown")
+                                                st.error(f"**Tool ({tool_name}):** {content[:100]}...")
+                                        
+                                        st.markdown(f"**Model:** gpt-4o-mini | **Temperature:** 0.1 | **Prompt prefix:** `{prefix_fingerprint}`")
+                                        shown_messages = len(messages)
+                                    
+                                    # The response streams in here as it is generated
+                                    stream_slot = st.empty()
                                 
-                                st.markdown(f"**Model:** gpt-4o-mini | **Temperature:** 0.1")
-                        
-                        # Make the API call
-                        response = client.chat.completions.create(
-                            model="gpt-4o-mini",
-                            messages=messages,
-                            tools=tools,
-                            tool_choice="auto",
-                            temperature=0.1
-                        )
-                        
-                        response_message = response.choices[0].message
-                        messages.append(response_message.model_dump())
-                        
-                        # Calculate API cost
-                        input_text = " ".join([str(msg.get("content", "")) for msg in messages[:-1] if msg.get("content")])
-                        output_text = str(response_message.content or "")
-                        step_data["api_cost"] = calculate_cost("gpt-4o-mini", input_text, output_text)
-                        
-                        # Store agent's reasoning
-                        if response_message.content:
-                            step_data["thinking"] = response_message.content
-                        
-                        # Show LLM response in real-time
-                        with live_output.container():
-                            st.markdown(f"### ✅ Step {iteration} - LLM Response Received")
-                            
-                            with st.expander(f"📥 LLM Output (Step {iteration})", expanded=True):
-                                st.markdown("**LLM Response:**")
-                                if response_message.content:
-                                    st.success(f"**Thinking:** {response_message.content}")
+                                # Make the API call
+                                response_message, usage, tool_tasks = await stream_completion(
+                                    client,
+                                    stream_slot,
+                                    model="gpt-4o-mini",
+                                    messages=messages,
+                                    tools=tools,
+                                    tool_choice="auto",
+                                    parallel_tool_calls=True,
+                                    temperature=0.1,
+                                    # The system prompt and tools lead every request unchanged, so later
+                                    # iterations hit OpenAI's prompt cache on the growing shared prefix;
+                                    # the key follows the prefix, so editing either routes to a fresh cache
+                                    extra_body={"prompt_cache_key": f"react-agent-{tool_mode}-{prefix_fingerprint}"}
+                                )
                                 
-                                if response_message.tool_calls:
-                                    st.info(f"**Tool Calls:** {len(response_message.tool_calls)} tools requested")
-                                    for i, tool_call in enumerate(response_message.tool_calls):
-                                        st.code(f"Tool {i+1}: {tool_call.function.name}({tool_call.function.arguments})", language="json")
-                                else:
-                                    st.warning("**No tool calls - Agent is done!**")
+                                # Truncated responses raise above and are never appended, and every tool call is
+                                # answered within its step, so the conversation always stays resumable
+                                messages.append(response_message)
+                                tool_calls = response_message.get("tool_calls")
                                 
-                                # Show cost
-                                st.markdown(f"**💰 API Cost:** {step_data['api_cost']}")
-                            
-                            # Show current conversation state
-                            with st.expander(f"💬 Conversation State (Step {iteration})", expanded=False):
-                                st.markdown(f"**Total messages in conversation:** {len(messages)}")
-                                st.code(json.dumps(messages[-1], indent=2), language="json")
-                        
-                        # Handle tool calls
-                        if response_message.tool_calls:
-                            # Update display to show tool execution
-                            with live_output.container():
-                                st.markdown(f"### 🔧 Step {iteration} - Executing Tools")
+                                # Calculate API cost
+                                step_data.update(calculate_cost("gpt-4o-mini", usage))
+                                if usage:
+                                    prompt_tokens = usage.prompt_tokens
+                                
+                                # Store agent's reasoning
+                                if response_message["content"]:
+                                    step_data["thinking"] = response_message["content"]
                                 
-                                for idx, tool_call in enumerate(response_message.tool_calls):
-                                    function_name = tool_call.function.name
-                                    function_args = json.loads(tool_call.function.arguments)
+                                # Show LLM response in real-time
+                                with live_output.container():
+                                    st.markdown(f"### ✅ Step {iteration} - LLM Response Received")
                                     
-                                    tool_data = {
-                                        "name": function_name,
-                                        "args": function_args,
-                                        "result": None,
-                                        "raw_output": None,
-                                        "error": None,
-                                        "cost": "Not available"  # Tool execution cost
-                                    }
+                                    with st.expander(f"📥 LLM Output (Step {iteration})", expanded=True):
+                                        st.markdown("**LLM Response:**")
+                                        if response_message["content"]:
+                                            st.success(f"**Thinking:** {response_message['content']}")
+                                        
+                                        if tool_calls:
+                                            st.info(f"**Tool Calls:** {len(tool_calls)} tools requested")
+                                            for i, tool_call in enumerate(tool_calls):
+                                                st.code(f"Tool {i+1}: {tool_call['function']['name']}({tool_call['function']['arguments']})", language="json")
+                                        else:
+                                            st.warning("**No tool calls - Agent is done!**")
+                                        
+                                        # Show cost
+                                        st.markdown(f"**💰 API Cost:** {step_data['api_cost'] or 'Not available'}")
                                     
-                                    # Show tool execution in real-time
-                                    with st.expander(f"🔧 Tool {idx+1}: {function_name}", expanded=True):
-                                        st.markdown(f"**Function:** `{function_name}`")
-                                        st.code(json.dumps(function_args, indent=2), language="json")
+                                    # Show current conversation state
+                                    with st.expander(f"💬 Conversation State (Step {iteration})", expanded=False):
+                                        st.markdown(f"**Total messages in conversation:** {len(messages)}")
+                                        st.code(format_json(messages[-1]), language="json")
+                                
+                                # Handle tool calls
+                                if tool_calls:
+                                    # Update display to show tool execution
+                                    with live_output.container():
+                                        st.markdown(f"### 🔧 Step {iteration} - Executing Tools")
                                         
-                                        with st.spinner(f"Executing {function_name}..."):
-                                            try:
-                                                # Execute tool
-                                                function_response = available_functions[function_name](**function_args)
-                                                tool_data["result"] = function_response
-                                                tool_data["raw_output"] = str(function_response)  # Store raw output
-                                                
-                                                # Show successful result
-                                                st.success(f"**✅ Success!** Tool executed successfully")
-                                                st.info(f"**Result:** {function_response}")
-                                                
-                                                # Add tool response to conversation
-                                                messages.append({
-                                                    "tool_call_id": tool_call.id,
-                                                    "role": "tool",
-                                                    "name": function_name,
-                                                    "content": function_response,
-                                                })
-                                                
-                                            except Exception as tool_error:
-                                                tool_data["error"] = str(tool_error)
-                                                
-                                                # Show error
-                                                st.error(f"**❌ Error!** Tool execution failed")
-                                                st.error(f"**Error:** {str(tool_error)}")
+                                        # The tools were started while the response streamed and run side by side on
+                                        # worker threads; malformed arguments fail only their own call
+                                        with st.spinner(f"Executing {len(tool_calls)} tool(s)..."):
+                                            outcomes = await asyncio.gather(*tool_tasks, return_exceptions=True)
+                                        
+                                        for idx, (tool_call, outcome) in enumerate(zip(tool_calls, outcomes)):
+                                            function_name = tool_call["function"]["name"]
+                                            # Calls whose arguments did not parse show them as sent
+                                            function_args = tool_call["function"]["arguments"] if isinstance(outcome, Exception) else outcome[0]
+                                            tool_data = {
+                                                "name": function_name,
+                                                "args": function_args,
+                                                "result": None,
+                                                "raw_output": None,
+                                                "error": None,
+                                                "cached": False,
+                                                "cost": "Not available"  # Tool execution cost
+                                            }
+                                            
+                                            # Show each tool's outcome
+                                            with st.expander(f"🔧 Tool {idx+1}: {function_name}", expanded=True):
+                                                st.markdown(f"**Function:** `{function_name}`")
+                                                st.code(format_json(function_args), language="json")
                                                 
-                                                # Add error response to conversation
-                                                messages.append({
-                                                    "tool_call_id": tool_call.id,
-                                                    "role": "tool",
-                                                    "name": function_name,
-                                                    "content": f"Error: {str(tool_error)}",
-                                                })
+                                                if isinstance(outcome, Exception):
+                                                    tool_data["error"] = str(outcome)
+                                                    
+                                                    # Show error
+                                                    st.error(f"**❌ Error!** Tool execution failed")
+                                                    st.error(f"**Error:** {str(outcome)}")
+                                                    
+                                                    # Add error response to conversation
+                                                    messages.append({
+                                                        "tool_call_id": tool_call["id"],
+                                                        "role": "tool",
+                                                        "name": function_name,
+                                                        "content": f"Error: {str(outcome)}",
+                                                    })
+                                                else:
+                                                    _, function_response, tool_data["cached"] = outcome
+                                                    tool_data["result"] = function_response
+                                                    tool_data["raw_output"] = str(function_response)  # Store raw output
+                                                    
+                                                    # Show successful result
+                                                    if tool_data["cached"]:
+                                                        st.success("**✅ Success!** Reused the result of an identical recent call")
+                                                    else:
+                                                        st.success(f"**✅ Success!** Tool executed successfully")
+                                                    st.info(f"**Result:** {function_response}")
+                                                    
+                                                    # Add tool response to conversation
+                                                    messages.append({
+                                                        "tool_call_id": tool_call["id"],
+                                                        "role": "tool",
+                                                        "name": function_name,
+                                                        "content": function_response,
+                                                    })
+                                            
+                                            step_data["tool_calls"].append(tool_data)
+                                        
+                                        # Show updated conversation state after tools
+                                        with st.expander(f"💬 Updated Conversation (After Tools)", expanded=False):
+                                            st.markdown(f"**Total messages now:** {len(messages)}")
+                                            st.markdown("**Last few tool responses:**")
+                                            for msg in messages[-len(tool_calls):]:
+                                                if msg.get("role") == "tool":
+                                                    st.code(f"Tool ({msg.get('name')}): {msg.get('content', '')[:100]}...", language="text")
+                                    
+                                    # A lone, successful fast tool call ends the run locally, saving a model round-trip
+                                    # (calculate reports bad input as an "Error: ..." result rather than raising)
+                                    fast_result = step_data["tool_calls"][0]
+                                    fast_output = str(fast_result["result"])
+                                    if (fast_finalize and len(tool_calls) == 1 and fast_result["name"] in _FAST_TOOLS and not fast_result["error"]
+                                            and not fast_output.startswith("Error") and len(fast_output) < _FAST_RESULT_LIMIT):
+                                        step_data["final_response"] = "\n\n".join(filter(None, [response_message["content"], fast_result["result"]]))
+                                        execution_steps.append(step_data)
+                                        
+                                        with live_output.container():
+                                            st.markdown(f"### 🎉 Step {iteration} - Task Completed!")
+                                            st.success("**Finished on a quick calculation - no further model call needed**")
+                                            st.info(step_data["final_response"])
+                                        break
+                                
+                                else:
+                                    # No more tool calls, agent is done
+                                    step_data["final_response"] = response_message["content"]
+                                    execution_steps.append(step_data)
                                     
-                                    step_data["tool_calls"].append(tool_data)
+                                    # Show final completion
+                                    with live_output.container():
+                                        st.markdown(f"### 🎉 Step {iteration} - Task Completed!")
+                                        st.success("**Agent has finished the task - no more tools needed**")
+                                        if response_message["content"]:
+                                            st.markdown("**Final Response:**")
+                                            st.info(response_message["content"])
+                                    break
                                 
-                                # Show updated conversation state after tools
-                                with st.expander(f"💬 Updated Conversation (After Tools)", expanded=False):
-                                    st.markdown(f"**Total messages now:** {len(messages)}")
-                                    st.markdown("**Last few tool responses:**")
-                                    for msg in messages[-len(response_message.tool_calls):]:
-                                        if msg.get("role") == "tool":
-                                            st.code(f"Tool ({msg.get('name')}): {msg.get('content', '')[:100]}...", language="text")
-                        
-                        else:
-                            # No more tool calls, agent is done
-                            step_data["final_response"] = response_message.content
-                            execution_steps.append(step_data)
-                            
-                            # Show final completion
-                            with live_output.container():
-                                st.markdown(f"### 🎉 Step {iteration} - Task Completed!")
-                                st.success("**Agent has finished the task - no more tools needed**")
-                                if response_message.content:
-                                    st.markdown("**Final Response:**")
-                                    st.info(response_message.content)
-                            break
-                        
-                        execution_steps.append(step_data)
-                        
-                        # Add delay and show transition to next step
-                        with live_output.container():
-                            st.markdown(f"### ⏳ Preparing Step {iteration + 1}...")
-                            st.info("Agent will continue thinking with the new information...")
-                        
-                        time.sleep(2)  # Longer delay to see each step
-                        
-                    except Exception as e:
-                        step_data["error"] = str(e)
-                        execution_steps.append(step_data)
-                        
-                        # Show error in real-time
-                        with live_output.container():
-                            st.markdown(f"### ❌ Step {iteration} - Error Occurred")
-                            st.error(f"**Error in iteration {iteration}:** {str(e)}")
-                        break
+                                execution_steps.append(step_data)
+                                
+                            except Exception as e:
+                                step_data["error"] = str(e)
+                                execution_steps.append(step_data)
+                                
+                                # Show error in real-time
+                                with live_output.container():
+                                    st.markdown(f"### ❌ Step {iteration} - Error Occurred")
+                                    st.error(f"**Error in iteration {iteration}:** {str(e)}")
+                                break
+                    return iteration
                 
-                # Clear the live output and show completion status
-                live_output.empty()
+                iteration = asyncio.run(run_react_loop())
+                
+                # Clear the live view (the steps are listed below) and show completion status
+                live_view.empty()
+                failed = bool(execution_steps) and bool(execution_steps[-1].get("error"))
+                run_status.update(
+                    label=f"{'❌' if failed else '✅'} ReAct agent finished after {iteration} step(s)",
+                    state="error" if failed else "complete"
+                )
                 
                 if iteration >= max_iterations and not any(step.get("final_response") for step in execution_steps):
                     st.warning(f"⏰ Agent reached maximum iterations ({max_iterations}). Task may not be fully complete.")
@@ -723,7 +956,7 @@ Be thorough and use multiple tools when helpful."""
                         with col1:
                             st.markdown(f"**Model:** {step.get('model_used', 'gpt-4o-mini')}")
                         with col2:
-                            st.markdown(f"**API Cost:** {step.get('api_cost', 'Not available')}")
+                            st.markdown(f"**API Cost:** {step['api_cost'] or 'Not available'}")
                         
                         # Show thinking
                         if step.get("thinking"):
@@ -738,7 +971,7 @@ Be thorough and use multiple tools when helpful."""
                                 
                                 # Show arguments
                                 with st.expander(f"📝 Arguments for {tool_call['name']}", expanded=False):
-                                    st.code(json.dumps(tool_call["args"], indent=2), language="json")
+                                    st.code(format_json(tool_call["args"]), language="json")
                                 
                                 # Show result or error
                                 if tool_call.get("error"):
@@ -776,31 +1009,24 @@ Be thorough and use multiple tools when helpful."""
                     # Show cost summary
                     st.markdown("### 💰 Cost Summary")
                     total_steps = len(execution_steps)
-                    api_calls = sum(1 for step in execution_steps if step.get("api_cost") and step["api_cost"] != "Not available")
+                    # Costs are carried as numbers, so the total needs no parsing of display labels
+                    step_costs = [step["api_cost_usd"] for step in execution_steps if step["api_cost_usd"] is not None]
+                    api_calls = len(step_costs)
                     tool_calls = sum(len(step.get("tool_calls", [])) for step in execution_steps)
+                    cache_hits = sum(tool_call["cached"] for step in execution_steps for tool_call in step.get("tool_calls", []))
                     
-                    col1, col2, col3 = st.columns(3)
+                    col1, col2, col3, col4 = st.columns(4)
                     with col1:
                         st.metric("Total Steps", total_steps)
                     with col2:
                         st.metric("API Calls", api_calls)
                     with col3:
                         st.metric("Tool Calls", tool_calls)
+                    with col4:
+                        st.metric("Cache Hits", cache_hits)
                     
-                    # Estimate total cost (rough)
-                    total_cost = 0
-                    cost_available = False
-                    for step in execution_steps:
-                        if step.get("api_cost") and "$" in str(step["api_cost"]):
-                            try:
-                                cost_str = step["api_cost"].split("$")[1].split(" ")[0]
-                                total_cost += float(cost_str)
-                                cost_available = True
-                            except:
-                                pass
-                    
-                    if cost_available:
-                        st.info(f"💵 **Estimated Total Cost:** ${total_cost:.6f}")
+                    if step_costs:
+                        st.info(f"💵 **Estimated Total Cost:** ${sum(step_costs):.6f}")
                     else:
                         st.info("💵 **Total Cost:** Not available")
                     
@@ -895,6 +1121,7 @@ Be thorough and use multiple tools when helpful."""
     
     with st.expander("Click to show/hide the ReAct agent code"):
         st.code("""
+import asyncio
 import openai
 import json
 from pydantic import BaseModel
@@ -914,7 +1141,14 @@ class TaskAnalysis(BaseModel):
     estimated_steps: int
     approach_strategy: str
 
-def react_agent_with_structured_output(client, user_request, tools, available_functions, max_iterations=5):
+def flush_log(lines, status=None):
+    \"\"\"Emit one iteration's log lines at once: into a Streamlit st.status if given, else to stdout\"\"\"
+    if status is None:
+        print("\\n".join(lines))
+    else:
+        status.write("\\n\\n".join(lines))
+
+async def react_agent_with_structured_output(client, user_request, tools, available_functions, max_iterations=5, status=None, placeholder=None):
     messages = [
         {
             "role": "system", 
@@ -927,56 +1161,93 @@ def react_agent_with_structured_output(client, user_request, tools, available_fu
     tools_used = set()
     
     for iteration in range(max_iterations):
-        print(f"\\n--- Iteration {iteration + 1} ---")
+        # Buffer this iteration's log and flush it once the iteration is done
+        log = [f"--- Iteration {iteration + 1} ---"]
+        if status is not None:
+            status.update(label=f"Iteration {iteration + 1}", state="running")
         
-        # Get AI response
-        response = client.chat.completions.create(
+        # Stream the AI response, showing text as it arrives
+        stream = await client.chat.completions.create(
             model="gpt-4o-mini",
             messages=messages,
             tools=tools,
-            tool_choice="auto"
+            tool_choice="auto",
+            stream=True
         )
         
-        response_message = response.choices[0].message
-        messages.append(response_message.model_dump())
+        content = ""
+        pending_calls = {}
+        finish_reason = None
+        async for chunk in stream:
+            choice = chunk.choices[0]
+            finish_reason = choice.finish_reason or finish_reason
+            if choice.delta.content:
+                content += choice.delta.content
+                if placeholder is not None:
+                    placeholder.markdown(content)
+            # Tool call names and arguments arrive in fragments, keyed by index
+            for delta in choice.delta.tool_calls or ():
+                call = pending_calls.setdefault(delta.index, {"id": None, "type": "function", "function": {"name": "", "arguments": ""}})
+                if delta.id:
+                    call["id"] = delta.id
+                if delta.function:
+                    call["function"]["name"] += delta.function.name or ""
+                    call["function"]["arguments"] += delta.function.arguments or ""
+        
+        if finish_reason == "length":
+            raise RuntimeError("Response was cut off at the token limit; retry with a larger max_tokens")
+        
+        # Build the assistant turn directly; omit tool_calls when there are none
+        tool_calls = [pending_calls[index] for index in sorted(pending_calls)]
+        assistant_message = {"role": "assistant", "content": content or None}
+        if tool_calls:
+            assistant_message["tool_calls"] = tool_calls
+        messages.append(assistant_message)
         
         # Track execution
         step_info = {
             "iteration": iteration + 1,
-            "thinking": response_message.content,
+            "thinking": content,
             "tools_called": []
         }
         
         # Show thinking
-        if response_message.content:
-            print(f"Agent thinks: {response_message.content}")
+        if content:
+            log.append(f"Agent thinks: {content}")
         
         # Handle tool calls
-        if response_message.tool_calls:
-            print("Agent is using tools...")
+        if tool_calls:
+            log.append("Agent is using tools...")
             
-            for tool_call in response_message.tool_calls:
-                function_name = tool_call.function.name
-                function_args = json.loads(tool_call.function.arguments)
-                
-                print(f"Using {function_name} with {function_args}")
+            async def invoke(tool_call):
+                function_args = json.loads(tool_call["function"]["arguments"])
+                log.append(f"Using {tool_call['function']['name']} with {function_args}")
+                # Sync tools run on worker threads, so independent calls overlap
+                return await asyncio.to_thread(available_functions[tool_call["function"]["name"]], **function_args)
+            
+            # Execute all requested tools concurrently
+            results = await asyncio.gather(
+                *(invoke(tool_call) for tool_call in tool_calls),
+                return_exceptions=True
+            )
+            
+            # Add results to messages in the order the model requested them
+            for tool_call, result in zip(tool_calls, results):
+                function_name = tool_call["function"]["name"]
                 tools_used.add(function_name)
                 step_info["tools_called"].append(function_name)
+                # Long search results are only previewed in the log
+                log.append(f"Tool result: {str(result)[:200]}")
                 
-                # Execute function
-                result = available_functions[function_name](**function_args)
-                print(f"Tool result: {result}")
-                
-                # Add result to messages
                 messages.append({
-                    "tool_call_id": tool_call.id,
+                    "tool_call_id": tool_call["id"],
                     "role": "tool",
                     "name": function_name,
-                    "content": result,
+                    "content": f"Error: {result}" if isinstance(result, Exception) else result,
                 })
         else:
             # No more tools needed, get structured summary
-            structured_response = client.beta.chat.completions.parse(
+            structured_response = await client.beta.chat.completions.parse(
                 model="gpt-4o-mini",
                 messages=messages + [
                     {"role": "user", "content": "Provide a structured summary of this ReAct session."}
@@ -986,24 +1257,28 @@ def react_agent_with_structured_output(client, user_request, tools, available_fu
             
             summary = structured_response.choices[0].message.parsed
             
-            print("\\n=== STRUCTURED SUMMARY ===")
-            print(f"Total Steps: {summary.total_steps}")
-            print(f"Tools Used: {', '.join(summary.tools_used)}")
-            print(f"Final Answer: {summary.final_answer}")
-            print("Key Insights:")
+            log.append("=== STRUCTURED SUMMARY ===")
+            log.append(f"Total Steps: {summary.total_steps}")
+            log.append(f"Tools Used: {', '.join(summary.tools_used)}")
+            log.append(f"Final Answer: {summary.final_answer}")
+            log.append("Key Insights:")
             for insight in summary.key_insights:
-                print(f"  • {insight}")
+                log.append(f"  • {insight}")
+            flush_log(log, status)
+            if status is not None:
+                status.update(label="ReAct agent finished", state="complete")
             
             return summary
         
         execution_steps.append(step_info)
+        flush_log(log, status)
     
     return execution_steps
 
 # Usage with task analysis
-def analyze_and_execute_task(client, task, tools, available_functions):
+async def analyze_and_execute_task(client, task, tools, available_functions):
     # First, analyze the task
-    task_analysis = client.beta.chat.completions.parse(
+    task_analysis = await client.beta.chat.completions.parse(
         model="gpt-4o-mini",
         messages=[
             {"role": "system", "content": "Analyze task complexity and requirements."},
@@ -1018,7 +1293,7 @@ def analyze_and_execute_task(client, task, tools, available_functions):
     print(f"Estimated Steps: {analysis.estimated_steps}")
     
     # Then execute with ReAct
-    result = react_agent_with_structured_output(
+    result = await react_agent_with_structured_output(
         client, task, tools, available_functions, 
         max_iterations=analysis.estimated_steps
     )
@@ -1026,12 +1301,13 @@ def analyze_and_execute_task(client, task, tools, available_functions):
     return analysis, result
 
 # Usage
-analysis, summary = analyze_and_execute_task(
+client = openai.AsyncOpenAI()
+analysis, summary = asyncio.run(analyze_and_execute_task(
     client, 
     "Plan a trip to Tokyo with weather and budget", 
     tools, 
     available_functions
-)
+))
         """, language="python")
     
     st.markdown("### 🌐 Adding Exa AI to ReAct Agents")
@@ -1039,19 +1315,23 @@ analysis, summary = analyze_and_execute_task(
         st.code("""
 import exa_py
 import os
+from functools import lru_cache
+
+@lru_cache(maxsize=1)
+def _get_exa():
+    \"\"\"Build the Exa client once, so every search reuses its HTTP connections\"\"\"
+    return exa_py.Exa(api_key=os.environ["EXA_API_KEY"])
 
 def create_exa_tool():
     \"\"\"Create an Exa-powered web search tool for ReAct agents\"\"\"
     
     def exa_web_search(query: str) -> str:
         \"\"\"Real-time web search using Exa AI\"\"\"
-        exa = exa_py.Exa(api_key=os.environ["EXA_API_KEY"])
-        
-        results = exa.search(
-            query=query,
+        # Ask Exa for one short highlight per result rather than slicing full documents locally
+        results = _get_exa().search_and_contents(
+            query,
             num_results=3,
-            text=True,
-            highlights=True
+            highlights={"num_sentences": 2, "highlights_per_url": 1}
         )
         
         search_summary = f"Web search results for '{query}':\\n\\n"
@@ -1059,7 +1339,7 @@ def create_exa_tool():
             search_summary += f"{i}. **{result.title}**\\n"
             search_summary += f"   URL: {result.url}\\n"
             if result.highlights:
-                search_summary += f"   Key info: {result.highlights[0][:200]}...\\n"
+                search_summary += f"   Key info: {result.highlights[0]}...\\n"
             search_summary += "\\n"
         
         return search_summary
@@ -1084,12 +1364,10 @@ def create_exa_company_research_tool():
     
     def exa_company_research(company_name: str) -> str:
         \"\"\"Research companies using Exa AI\"\"\"
-        exa = exa_py.Exa(api_key=os.environ["EXA_API_KEY"])
-        
-        results = exa.search(
-            query=f"{company_name} company business model revenue",
+        results = _get_exa().search_and_contents(
+            f"{company_name} company business model revenue",
             num_results=3,
-            text=True,
+            text={"max_characters": 300},
             category="company"
         )
         
@@ -1098,7 +1376,7 @@ def create_exa_company_research_tool():
             research_summary += f"{i}. **{result.title}**\\n"
             research_summary += f"   Source: {result.url}\\n"
             if result.text:
-                research_summary += f"   Info: {result.text[:300]}...\\n"
+                research_summary += f"   Info: {result.text}...\\n"
             research_summary += "\\n"
         
         return research_summary